@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+
+import message
+from login import *
+from modules.checkpoint import load_checkpoint
+from modules.retry import classify
+
+
+def load_jobs(path: str) -> list[dict]:
+    '''
+    Reads the job queue from a JSON file, either a list of jobs or `{"jobs": [...]}`. Example job file:
+    ```
+    {"jobs": [
+        {"action": "search", "queries": ["IT HR", "Tech Recruiter"], "start_page": 1, "end_page": 5},
+        {"action": "message", "start_index": 0, "end_index": 200, "limit": 50},
+        {"action": "resume"}
+    ]}
+    ```
+    '''
+    with open(path, 'r', encoding="utf-8") as file:
+        jobs = json.load(file)
+    return jobs["jobs"] if isinstance(jobs, dict) else jobs
+
+
+def jobs_from_args(args: argparse.Namespace) -> list[dict]:
+    if args.jobs:
+        return load_jobs(args.jobs)
+    if not args.action:
+        raise SystemExit("Pass a job file with --jobs or an --action to run!")
+    job = {"action": args.action, "queries": args.query, "limit": args.limit}
+    if args.pages:
+        job["start_page"], job["end_page"] = args.pages
+    if args.range:
+        job["start_index"], job["end_index"] = args.range
+    return [job]
+
+
+def run_search_job(driver: WebDriver, job: dict) -> int:
+    added = 0
+    for query in job.get("queries") or [SEARCH_STRING]:
+        added += search_and_add_connections(
+            driver, job.get("start_page", 1), job.get("end_page"), query, interactive=False)
+    return added
+
+
+def run_message_job(driver: WebDriver, job: dict) -> None:
+    message.message_count = job.get("limit")
+    find_connections(driver, job.get("start_index"),
+                     job.get("end_index"), job.get("limit"))
+
+
+def run_resume_job(driver: WebDriver, job: dict) -> None:
+    checkpoint = load_checkpoint()
+    if not checkpoint:
+        print_lg("No unfinished messaging run to resume.")
+        return
+    resume_connections(driver, checkpoint)
+
+
+job_runners = {
+    "search": run_search_job,
+    "message": run_message_job,
+    "resume": run_resume_job,
+}
+
+
+def run_jobs(jobs: list[dict]) -> None:
+    '''
+    Runs `jobs` back to back in one browser session, without any dialogs
+    * A failing job is logged and the queue moves on to the next one
+    * If a job failed because the browser session was lost, a new session is started and logged in for the next jobs.
+      An interrupted messaging job is continued by a later "resume" job
+    '''
+    set_unattended()
+    for job in jobs:
+        if job.get("action") not in job_runners:
+            raise ValueError(f'Unknown action "{job.get("action")}" in job {job}, expected one of {list(job_runners)}')
+
+    email = os.getenv("LINKEDIN_EMAIL")
+    password = os.getenv("LINKEDIN_PASSWORD")
+    if not email or not password:
+        print_lg("Error: Please set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env file")
+        return
+    try:
+        driver = login_LN(email, password) or get_driver()
+        if not is_logged_in_LN():
+            print_lg("Couldn't log in, skipping all jobs!")
+            return
+        for number, job in enumerate(jobs, 1):
+            print_lg(f"Running job {number}/{len(jobs)}: {job}")
+            try:
+                result = job_runners[job["action"]](driver, job)
+                print_lg(f"Finished job {number}/{len(jobs)}" + (f", result: {result}" if result is not None else ""))
+            except Exception as e:
+                critical_error_log(f"Job {number} failed", e)
+                if classify(e) == "dead_session":
+                    print_lg("Browser session was lost, starting a new one for the next jobs")
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    restart_driver()
+                    driver = login_LN(email, password) or get_driver()
+    finally:
+        print_lg("Closing the browser...")
+        get_driver().quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs searches and messaging without any dialogs, from a job file or a single job given as arguments")
+    parser.add_argument("--jobs", help="JSON job file, see load_jobs")
+    parser.add_argument("--action", choices=list(job_runners))
+    parser.add_argument("--query", action="append", help="Search query, can be given several times (default: SEARCH_STRING)")
+    parser.add_argument("--pages", type=int, nargs=2, metavar=("START", "END"), help="Search result pages to go through")
+    parser.add_argument("--range", type=int, nargs=2, metavar=("START", "END"), help="Connection indexes to message")
+    parser.add_argument("--limit", type=int, help="Maximum number of messages to send")
+    run_jobs(jobs_from_args(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+'''
+Browser-free micro-benchmarks of the bot's control flow on `FakeDriver`.
+
+Usage (from the repository root):
+    python -m benchmarks.control_flow --latency 0.001 --save-baseline benchmarks/results/commands.json
+    python -m benchmarks.control_flow --baseline benchmarks/results/commands.json
+
+For every scenario it reports milliseconds and WebDriver commands per item. With `--baseline` it exits with
+status 1 if any scenario sends more commands per item than the saved baseline.
+'''
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.site import BenchmarkSite
+
+INVITE_DIALOG_HTML = """
+<div role="dialog">
+  <button aria-label="Dismiss">&times;</button>
+  <p>Add a note to your invitation? <a href="#">Learn more</a></p>
+  <button class="artdeco-button--secondary"><span>Add a note</span></button>
+  <button class="artdeco-button--primary" aria-label="Send without a note"><span>Send without a note</span></button>
+</div>
+"""
+
+
+def configure(logs_path: str) -> None:
+    '''
+    Keeps the bot's state out of the real logs folder and turns off pacing and caches. Must run before any bot module is imported.
+    '''
+    import config.settings as settings
+    settings.logs_folder_path = logs_path
+    settings.rate_limits = {}
+    settings.rate_jitter = 0
+    settings.profile_cache_ttl_hours = 0
+    settings.http_validation = False
+    settings.export_metrics = False
+
+
+def make_driver(site: BenchmarkSite, latency: float):
+    '''
+    Returns a `FakeDriver` serving the pages of `site`, with the scripts and clicks of LinkedIn's pages simulated
+    '''
+    from benchmarks.fake_driver import FakeDriver, inner_text
+    from message import EXTRACT_CARDS_JS, LOAD_MORE_JS, CONNECTION_CARD_XPATH
+    from connections import SEND_INVITATION_JS, INVITATION_STATE_JS
+
+    driver = FakeDriver(site.render_path, latency)
+    stats = site.stats
+
+    def extract_cards(driver, start=0):
+        records = []
+        cards = driver.window.root.xpath(CONNECTION_CARD_XPATH)
+        for index, card in enumerate(cards[start or 0:], start or 0):
+            profile = card.xpath('.//a[@data-view-name="connections-profile"]')
+            message = card.xpath('.//div[@data-view-name="message-button"]//a[@aria-label="Message"]')
+            lines = inner_text(card).split("\n")
+            records.append({
+                "index": index,
+                "profile_link": profile[0].get("href") if profile else None,
+                "message_link": message[0].get("href") if message else None,
+                "name": lines[0] if lines else "",
+                "headline": lines[1] if len(lines) > 1 else "",
+            })
+        return records
+
+    def load_more(driver, element=None):
+        loaded = len(driver.window.root.xpath(CONNECTION_CARD_XPATH))
+        driver.append_html('//section[@id="connections"]', site.render_path(f"/api/connections?start={loaded}"))
+        if len(driver.window.root.xpath(CONNECTION_CARD_XPATH)) >= site.connections:
+            driver.remove('//button[@id="load-more"]')
+        return loaded
+
+    def send_invite(driver, element):
+        stats["invites"] += 1
+        driver.remove('//div[@role="dialog"]')
+
+    def click_send_invitation(driver):
+        button = driver.element(
+            '//div[@role="dialog"]//button[@aria-label="Send without a note" or normalize-space(.)="Send without a note"]')
+        if button is None:
+            return "no-dialog" if driver.element('//div[@role="dialog"]') is None else "unknown-layout"
+        driver.click(button)
+        return "sent"
+
+    def invitation_state(driver, button):
+        if driver.element('//div[@role="dialog"]') is not None:
+            return "dialog"
+        return "pending" if "pending" in inner_text(button._check()).lower() else None
+
+    def send_message(driver, element):
+        stats["messages"] += 1
+        driver.append_html('//main', '<div class="msg-s-message-list"></div>')
+
+    driver.register_script(EXTRACT_CARDS_JS, extract_cards)
+    driver.register_script(LOAD_MORE_JS, lambda driver: load_more(driver) if driver.element('//button[@id="load-more"]') is not None
+                           else len(driver.window.root.xpath(CONNECTION_CARD_XPATH)))
+    driver.register_script(SEND_INVITATION_JS, click_send_invitation)
+    driver.register_script(INVITATION_STATE_JS, invitation_state)
+    driver.register_click('//button[.//span[text()="Connect"]]', lambda driver, element: driver.append_html("//body", INVITE_DIALOG_HTML))
+    driver.register_click('//div[@role="dialog"]//button[@aria-label="Send without a note"]', send_invite)
+    driver.register_click('//div[@role="dialog"]//button[not(@aria-label="Send without a note")]',
+                          lambda driver, element: driver.remove('//div[@role="dialog"]'))
+    driver.register_click('//button[@id="load-more"]', load_more)
+    driver.register_click('//button[contains(@class, "msg-form__send-button")]', send_message)
+    return driver
+
+
+def bench_add_profiles_from_page(driver, site: BenchmarkSite) -> int:
+    from connections import add_profiles_from_page
+    from modules.selector_registry import selector_registry
+    driver.get(f"{site.url}/search/results/people/?keywords=benchmark&page=1")
+    return add_profiles_from_page(driver, selector_registry.find_all(driver, "search_result_cards"))
+
+
+def bench_connect_alter_buttons(driver, site: BenchmarkSite) -> int:
+    from connections import connect_alter_buttons
+    from modules.selector_registry import selector_registry
+    driver.get(f"{site.url}/search/results/people/?keywords=benchmark&page=2")
+    return connect_alter_buttons(driver, selector_registry.find_all(driver, "search_connect_buttons"))
+
+
+def bench_is_logged_in(driver, site: BenchmarkSite) -> int:
+    import modules.open_chrome as open_chrome
+    from login import is_logged_in_LN
+    open_chrome.driver = driver
+    driver.get(f"{site.url}/feed/")
+    calls = 20
+    for _ in range(calls):
+        assert is_logged_in_LN()
+    return calls
+
+
+def bench_validate_profile(driver, site: BenchmarkSite) -> int:
+    from message import open_and_validate_profile
+    profiles = 10
+    for index in range(profiles):
+        open_and_validate_profile(driver, f"{site.url}/in/bench-person-{index}/")
+    return profiles
+
+
+def bench_harvest_connections(driver, site: BenchmarkSite) -> int:
+    from message import harvest_connection_cards
+    driver.get(f"{site.url}/mynetwork/invite-connect/connections/")
+    return sum(len(cards) for cards in harvest_connection_cards(driver, 0, site.connections))
+
+
+def bench_send_message(driver, site: BenchmarkSite) -> int:
+    from message import send_message
+    messages = 10
+    for index in range(messages):
+        driver.get(f"{site.url}/messaging/compose/?recipient=bench-person-{index}")
+        send_message(driver)
+    return messages
+
+
+def bench_validate_over_http(driver, site: BenchmarkSite) -> int:
+    '''
+    Runs the HTTP validation backend against profile pages served by a local copy of the site, with the fake browser's cookies
+    '''
+    from benchmarks.site import get_person
+    from message import validate_profile_over_http
+    profiles = 10
+    with BenchmarkSite(connections=site.connections) as served:
+        driver.add_cookie({"name": "li_at", "value": "benchmark", "domain": "127.0.0.1", "path": "/"})
+        for index in range(profiles):
+            result = validate_profile_over_http(driver, f"{served.url}/in/bench-person-{index}/")
+            if result != (True, get_person(index)["company"]):
+                raise AssertionError(f"HTTP validation of bench-person-{index} returned {result}")
+    return profiles
+
+
+scenarios = {
+    "add_profiles_from_page": bench_add_profiles_from_page,
+    "connect_alter_buttons": bench_connect_alter_buttons,
+    "is_logged_in_LN": bench_is_logged_in,
+    "open_and_validate_profile": bench_validate_profile,
+    "harvest_connection_cards": bench_harvest_connections,
+    "send_message": bench_send_message,
+    "validate_profile_over_http": bench_validate_over_http,
+}
+
+
+def run(latency: float, connections: int) -> dict:
+    site = BenchmarkSite(connections=connections)
+    configure(tempfile.mkdtemp(prefix="linkedin-bot-control-flow-"))
+    from modules.helpers import set_unattended
+    set_unattended()
+
+    results = {}
+    for name, scenario in scenarios.items():
+        driver = make_driver(site, latency)
+        start = perf_counter()
+        items = scenario(driver, site)
+        elapsed = perf_counter() - start
+        items = max(items or 0, 1)
+        results[name] = {
+            "items": items,
+            "ms_per_item": round(elapsed / items * 1000, 3),
+            "commands_per_item": round(sum(driver.commands.values()) / items, 2),
+            "commands": dict(driver.commands.most_common()),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    '''
+    Returns a message for every scenario that sends more WebDriver commands per item than in `baseline`
+    '''
+    return [f'{name}: {result["commands_per_item"]} commands per item, baseline {baseline[name]["commands_per_item"]}'
+            for name, result in results.items()
+            if name in baseline and result["commands_per_item"] > baseline[name]["commands_per_item"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the bot's control flow and WebDriver round trips without a browser")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every fake WebDriver command takes")
+    parser.add_argument("--connections", type=int, default=50, help="Connections in the fake connections list")
+    parser.add_argument("--baseline", help="Fail if commands per item grew compared to this saved report")
+    parser.add_argument("--save-baseline", help="Save this report as the baseline")
+    args = parser.parse_args()
+
+    results = run(args.latency, args.connections)
+    print(f"{'scenario':<28}{'items':>8}{'ms/item':>12}{'commands/item':>16}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['items']:>8}{result['ms_per_item']:>12}{result['commands_per_item']:>16}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
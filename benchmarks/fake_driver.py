@@ -0,0 +1,377 @@
+'''
+In-process stand-in for the subset of the Selenium WebDriver API the bot uses, backed by lxml DOM snapshots.
+
+No browser and no JavaScript: pages come from HTML snapshots (recorded with `record_snapshot`, or rendered by
+`benchmarks.site.BenchmarkSite.render_path`), scripts are answered by handlers registered for the exact JS the bot sends,
+and clicks run registered handlers that edit the DOM. Every WebDriver command is counted in `commands` and can be
+delayed by `latency` seconds, to benchmark the Python control flow and its number of round trips.
+'''
+import os
+import itertools
+
+from time import sleep
+from collections import Counter
+from urllib.parse import urljoin
+
+import lxml.html
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+)
+
+from modules.clickers_and_finders import COUNT_XPATH_JS, DOM_QUIET_TIME_JS
+
+BLOCK_TAGS = {"address", "article", "aside", "br", "dd", "div", "dl", "dt", "footer", "form", "h1", "h2", "h3", "h4",
+              "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "tr", "ul"}
+
+
+def inner_text(node) -> str:
+    '''
+    Approximates `innerText`: text of `node` without scripts, one line per block element, blank lines dropped
+    '''
+    parts = []
+
+    def walk(element) -> None:
+        if not isinstance(element.tag, str) or element.tag in ("script", "style"):
+            return
+        block = element.tag in BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        parts.append(element.text or "")
+        for child in element:
+            walk(child)
+            parts.append(child.tail or "")
+        if block:
+            parts.append("\n")
+
+    walk(node)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def is_hidden(node) -> bool:
+    for element in itertools.chain([node], node.iterancestors()):
+        style = (element.get("style") or "").replace(" ", "").lower()
+        if element.get("hidden") is not None or "display:none" in style or "visibility:hidden" in style:
+            return True
+    return False
+
+
+def record_snapshot(driver, path: str) -> None:
+    '''
+    Saves the current page of a real `driver` as a snapshot that `FakeDriver` can replay
+    '''
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding="utf-8") as file:
+        file.write(driver.page_source)
+
+
+class FakeWindow:
+    def __init__(self, handle: str) -> None:
+        self.handle = handle
+        self.url = "about:blank"
+        self.root = lxml.html.document_fromstring("<html><body></body></html>")
+
+
+class FakeElement(WebElement):
+    '''
+    `WebElement` backed by an lxml node of a `FakeWindow`. Raises `StaleElementReferenceException` once its page was left or it was removed.
+    '''
+
+    def __init__(self, driver: "FakeDriver", window: FakeWindow, node) -> None:
+        super().__init__(driver, f"fake-{id(node)}")
+        self.driver = driver
+        self.window = window
+        self.root = window.root
+        self.node = node
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeElement) and other.node is self.node
+
+    def __hash__(self) -> int:
+        return id(self.node)
+
+    def _check(self):
+        if self.window.root is not self.root or not (self.node is self.root or self.root in self.node.iterancestors()):
+            raise StaleElementReferenceException("Element is no longer attached to the DOM")
+        return self.node
+
+    @property
+    def tag_name(self) -> str:
+        self.driver.command("tag_name")
+        return self._check().tag
+
+    @property
+    def text(self) -> str:
+        self.driver.command("text")
+        node = self._check()
+        return "" if is_hidden(node) else inner_text(node)
+
+    def get_attribute(self, name: str) -> str | None:
+        self.driver.command("get_attribute")
+        node = self._check()
+        if name in ("innerText", "textContent"):
+            return inner_text(node)
+        value = node.get(name)
+        if value is not None and name in ("href", "src"):
+            return urljoin(self.window.url, value)
+        return value
+
+    def is_displayed(self) -> bool:
+        self.driver.command("is_displayed")
+        return not is_hidden(self._check())
+
+    def is_enabled(self) -> bool:
+        self.driver.command("is_enabled")
+        return self._check().get("disabled") is None
+
+    def click(self) -> None:
+        self.driver.command("click")
+        self.driver.click(self)
+
+    def send_keys(self, *values) -> None:
+        self.driver.command("send_keys")
+        self.driver.type(self, "".join(values))
+
+    def clear(self) -> None:
+        self.driver.command("clear")
+        node = self._check()
+        node.text = None
+        node.set("value", "")
+
+    def find_element(self, by=By.ID, value=None) -> "FakeElement":
+        return self.driver._find(self.window, self._check(), by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None) -> list["FakeElement"]:
+        return self.driver._find(self.window, self._check(), by, value)
+
+
+class FakeSwitchTo:
+    def __init__(self, driver: "FakeDriver") -> None:
+        self.driver = driver
+
+    def window(self, handle: str) -> None:
+        self.driver.command("switch_to.window")
+        if handle not in self.driver.windows:
+            raise NoSuchWindowException(f"No window {handle}")
+        self.driver.current_window_handle = handle
+
+    def new_window(self, type_hint: str | None = None) -> None:
+        self.driver.command("switch_to.new_window")
+        self.driver.current_window_handle = self.driver._new_window()
+
+
+class FakeDriver:
+    '''
+    Fake WebDriver replaying DOM snapshots.
+    * `pages(url)` returns the HTML for `url`, or `None` for an empty page. A dict of `{url: html}` works too
+    * `scripts` maps the exact JS the bot sends (e.g. `COUNT_XPATH_JS`) to `handler(driver, *args)`, see `register_script`
+    * `clicks` is a list of `(xpath, handler(driver, element))`, a click runs the handlers whose XPath matches the element.
+      Clicking a link without a handler navigates to it
+    * `commands` counts every WebDriver command by name, each one first sleeps `latency` seconds
+    '''
+
+    def __init__(self, pages, latency: float = 0.0) -> None:
+        self.pages = pages.get if isinstance(pages, dict) else pages
+        self.latency = latency
+        self.commands = Counter()
+        self.scripts = {}
+        self.clicks = []
+        self.cookies = []
+        self.windows: dict[str, FakeWindow] = {}
+        self._handles = itertools.count(1)
+        self.current_window_handle = self._new_window()
+        self.switch_to = FakeSwitchTo(self)
+        self.register_default_scripts()
+
+    # < Bookkeeping
+    def command(self, name: str) -> None:
+        self.commands[name] += 1
+        if self.latency:
+            sleep(self.latency)
+
+    def reset_commands(self) -> None:
+        self.commands.clear()
+
+    def _new_window(self) -> str:
+        handle = f"window-{next(self._handles)}"
+        self.windows[handle] = FakeWindow(handle)
+        return handle
+
+    @property
+    def window(self) -> FakeWindow:
+        if self.current_window_handle not in self.windows:
+            raise NoSuchWindowException("The current window was closed")
+        return self.windows[self.current_window_handle]
+    # >
+
+    # < WebDriver API
+    def get(self, url: str) -> None:
+        self.command("get")
+        self.load(url)
+
+    def load(self, url: str) -> None:
+        window = self.window
+        html = self.pages(url)
+        window.url = url
+        window.root = lxml.html.document_fromstring(html or "<html><body></body></html>")
+
+    @property
+    def current_url(self) -> str:
+        self.command("current_url")
+        return self.window.url
+
+    @property
+    def page_source(self) -> str:
+        self.command("page_source")
+        return lxml.html.tostring(self.window.root, encoding="unicode")
+
+    @property
+    def title(self) -> str:
+        self.command("title")
+        return self.window.root.findtext(".//title") or ""
+
+    @property
+    def window_handles(self) -> list[str]:
+        self.command("window_handles")
+        return list(self.windows)
+
+    def close(self) -> None:
+        self.command("close")
+        self.windows.pop(self.current_window_handle, None)
+
+    def quit(self) -> None:
+        self.command("quit")
+        self.windows.clear()
+
+    def find_element(self, by=By.ID, value=None) -> FakeElement:
+        return self._find(self.window, None, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None) -> list[FakeElement]:
+        return self._find(self.window, None, by, value)
+
+    def execute_script(self, script: str, *args):
+        self.command("execute_script")
+        handler = self.scripts.get(script)
+        if handler is None:
+            handler = next((handler for fragment, handler in self.scripts.items() if fragment in script), None)
+        if handler is None:
+            raise NotImplementedError(f"No FakeDriver handler for script: {script.strip()[:120]}")
+        return handler(self, *args)
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        self.command("execute_cdp_cmd")
+        return {}
+
+    def get_cookies(self) -> list[dict]:
+        self.command("get_cookies")
+        return list(self.cookies)
+
+    def add_cookie(self, cookie: dict) -> None:
+        self.command("add_cookie")
+        self.cookies.append(cookie)
+
+    def delete_all_cookies(self) -> None:
+        self.command("delete_all_cookies")
+        self.cookies.clear()
+    # >
+
+    # < DOM simulation
+    def _find(self, window: FakeWindow, node, by: str, value: str, single: bool = False):
+        self.command("find_element" if single else "find_elements")
+        context = window.root if node is None else node
+        if by == By.XPATH:
+            found = context.xpath(value)
+        elif by == By.CSS_SELECTOR:
+            found = context.cssselect(value)
+        elif by == By.ID:
+            found = context.xpath(".//*[@id=$value]", value=value)
+        elif by == By.CLASS_NAME:
+            found = context.xpath(".//*[contains(concat(' ', normalize-space(@class), ' '), $value)]", value=f" {value} ")
+        elif by == By.LINK_TEXT:
+            found = [link for link in context.iter("a") if inner_text(link) == value]
+        elif by == By.PARTIAL_LINK_TEXT:
+            found = [link for link in context.iter("a") if value in inner_text(link)]
+        elif by == By.TAG_NAME:
+            found = list(context.iter(value))
+        elif by == By.NAME:
+            found = context.xpath(".//*[@name=$value]", value=value)
+        else:
+            raise NotImplementedError(f"FakeDriver can't find elements by {by}")
+        elements = [FakeElement(self, window, element) for element in found if isinstance(getattr(element, "tag", None), str)]
+        if single:
+            if not elements:
+                raise NoSuchElementException(f"No element for {by}={value}")
+            return elements[0]
+        return elements
+
+    def element(self, xpath: str) -> FakeElement | None:
+        '''
+        Returns the first element of the current page at `xpath` without counting a command, for handlers
+        '''
+        found = self.window.root.xpath(xpath)
+        return FakeElement(self, self.window, found[0]) if found else None
+
+    def click(self, element: FakeElement) -> None:
+        node = element._check()
+        handled = False
+        for xpath, handler in self.clicks:
+            if node in element.root.xpath(xpath):
+                handler(self, element)
+                handled = True
+        if not handled and node.tag == "a" and node.get("href") and not node.get("href").startswith("#"):
+            self.load(urljoin(element.window.url, node.get("href")))
+
+    def type(self, element: FakeElement, text: str) -> None:
+        node = element._check()
+        if node.tag in ("input", "textarea"):
+            node.set("value", (node.get("value") or "") + text)
+        else:
+            node.text = (node.text or "") + text
+
+    def register_script(self, script: str, handler) -> None:
+        '''
+        Answers `execute_script(script, *args)` with `handler(driver, *args)`.
+        Scripts are matched exactly first, then `script` is looked for as a fragment of the sent JS.
+        '''
+        self.scripts[script] = handler
+
+    def register_click(self, xpath: str, handler) -> None:
+        self.clicks.append((xpath, handler))
+
+    def append_html(self, parent_xpath: str, html: str) -> None:
+        '''
+        Appends the elements of `html` to the first element at `parent_xpath`, like `insertAdjacentHTML('beforeend', ...)`
+        '''
+        parent = self.window.root.xpath(parent_xpath)[0]
+        for fragment in lxml.html.fragments_fromstring(html):
+            if isinstance(fragment, str):
+                continue
+            parent.append(fragment)
+
+    def remove(self, xpath: str) -> None:
+        for node in self.window.root.xpath(xpath):
+            node.getparent().remove(node)
+
+    def register_default_scripts(self) -> None:
+        '''
+        Handlers for the JS of `modules.clickers_and_finders` and the small inline scripts used across the bot
+        '''
+        def scroll_into_view(driver, element=None):
+            if element is not None:
+                element._check()
+
+        self.register_script(COUNT_XPATH_JS, lambda driver, xpath: len(driver.window.root.xpath(xpath)))
+        # Snapshots never change by themselves, so the DOM is always quiet
+        self.register_script(DOM_QUIET_TIME_JS, lambda driver: 1e9)
+        self.register_script("return document.readyState;", lambda driver: "complete")
+        self.register_script("return navigator.userAgent;", lambda driver: "FakeDriver")
+        self.register_script("window.scrollTo(", lambda driver, *args: None)
+        self.register_script("scrollIntoView(", scroll_into_view)
+        self.register_script("arguments[0].click();", lambda driver, element: driver.click(element))
+        self.register_script("window.location.href = arguments[0];", lambda driver, url: driver.load(url))
+    # >
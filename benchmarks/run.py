@@ -0,0 +1,168 @@
+'''
+End-to-end benchmark of the bot against the local stand-in site, in headless Chrome.
+
+Usage (from the repository root):
+    python -m benchmarks.run --connections 50 --search-pages 3 --latency 0.2 --output benchmarks/results/baseline.json
+
+Reports invites and messages per minute, per-stage latency from `modules.metrics` and the peak RSS of the browser.
+'''
+import os
+import sys
+import json
+import argparse
+import tempfile
+import threading
+
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.site import BenchmarkSite
+
+
+def configure(site: BenchmarkSite, logs_path: str, workers: int, http_validation: bool = False) -> None:
+    '''
+    Points the bot at `site` and keeps its state out of the real logs folder. Must run before any bot module is imported.
+    '''
+    import config.settings as settings
+    settings.linkedin_url = site.url
+    settings.logs_folder_path = logs_path
+    settings.run_in_background = True
+    settings.safe_mode = True
+    settings.stealth_mode = False
+    settings.worker_count = workers
+    settings.persist_session = False
+    settings.persist_browser_cache = False
+    settings.profile_cache_ttl_hours = 0
+    settings.http_validation = http_validation
+    settings.rate_limits = {}
+    settings.rate_jitter = 0
+    settings.prometheus_textfile_path = ""
+
+
+class RSSSampler:
+    '''
+    Samples the resident memory of chromedriver and every browser process below it, keeping the peak. Needs `psutil`.
+    '''
+
+    def __init__(self, pid: int, interval: float = 0.25) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        try:
+            import psutil
+        except ImportError:
+            print("psutil is not installed, peak browser RSS is not measured")
+            return
+        root = psutil.Process(self.pid)
+        while not self._stop.is_set():
+            try:
+                processes = [root] + root.children(recursive=True)
+                rss = 0
+                for process in processes:
+                    try:
+                        rss += process.memory_info().rss
+                    except psutil.Error:
+                        pass
+                self.peak = max(self.peak or 0, rss)
+            except psutil.Error:
+                return
+            sleep(self.interval)
+
+    def start(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> int | None:
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+def stage_report(summary: dict) -> dict:
+    '''
+    Per-stage latency and outcomes of the run `modules.metrics` recorded last
+    '''
+    return {"stages": summary["stages"], "outcomes": summary["outcomes"]}
+
+
+def run(args: argparse.Namespace) -> dict:
+    site = BenchmarkSite(latency=args.latency, jitter=args.jitter, connections=args.connections,
+                         search_pages=args.search_pages, per_page=args.per_page).start()
+    logs_path = tempfile.mkdtemp(prefix="linkedin-bot-benchmark-")
+    configure(site, logs_path, args.workers, args.http_validation)
+
+    from login import login_LN
+    from connections import search_and_add_connections
+    from message import find_connections
+    from modules.open_chrome import get_driver
+    from modules.metrics import metrics
+    from modules.helpers import set_unattended
+    set_unattended()
+
+    report = {"settings": vars(args), "logs": logs_path}
+    driver = get_driver()
+    sampler = RSSSampler(driver.service.process.pid).start()
+    try:
+        start = perf_counter()
+        login_LN("benchmark@example.com", "benchmark")
+        report["login_seconds"] = round(perf_counter() - start, 3)
+
+        start = perf_counter()
+        search_and_add_connections(driver, 1, args.search_pages, "benchmark", interactive=False)
+        elapsed = perf_counter() - start
+        report["search"] = {
+            "seconds": round(elapsed, 3),
+            "invites": site.stats["invites"],
+            "invites_per_minute": round(site.stats["invites"] / elapsed * 60, 2),
+            **stage_report(metrics.summary()),
+        }
+
+        start = perf_counter()
+        import message
+        message.message_count = args.connections
+        find_connections(driver, 0, args.connections, args.connections)
+        elapsed = perf_counter() - start
+        report["messaging"] = {
+            "seconds": round(elapsed, 3),
+            "messages": site.stats["messages"],
+            "profiles_per_minute": round(site.stats["messages"] / elapsed * 60, 2),
+            **stage_report(metrics.summary()),
+        }
+    finally:
+        peak = sampler.stop()
+        report["peak_browser_rss_mb"] = round(peak / 1024 / 1024, 1) if peak else None
+        driver.quit()
+        site.stop()
+
+    report["requests"] = site.stats["requests"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs search and messaging end-to-end against the local stand-in site")
+    parser.add_argument("--connections", type=int, default=50, help="Connections to message")
+    parser.add_argument("--search-pages", type=int, default=3, help="Search result pages to send invites on")
+    parser.add_argument("--per-page", type=int, default=10, help="Cards per search page and per connections list load")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response of the site")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds (0 to jitter) added to every response")
+    parser.add_argument("--workers", type=int, default=1, help="worker_count used for messaging")
+    parser.add_argument("--http-validation", action="store_true", help="Validate profiles over HTTP instead of in the browser")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding="utf-8") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import json
+import random
+import threading
+
+from time import sleep
+from string import Template
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> Template:
+    with open(os.path.join(FIXTURES_PATH, name), 'r', encoding="utf-8") as file:
+        return Template(file.read())
+
+
+def get_person(index: int) -> dict:
+    '''
+    Returns the made up person shown at `index` of search results and of the connections list
+    '''
+    return {
+        "profile": f"bench-person-{index}",
+        "name": f"Bench Person {index}",
+        "headline": f"Software Engineer {index}",
+        "company": f"Company {index % 50}",
+    }
+
+
+class BenchmarkSite:
+    '''
+    Local stand-in for the LinkedIn pages the bot uses, rendered from `benchmarks/fixtures`.
+    * Copies only the DOM hooks the bot depends on: login form, search results with Connect buttons and the invitation modal,
+      the connections list with a lazy "Load more", profile pages with the "Current company:" aria-label and the messaging page
+    * Every request waits `latency` seconds plus a random `0 to jitter` seconds before the response
+    * `stats` counts page views, sent invites and sent messages
+    * Pages can be rendered without serving them with `render_path`, links then point at the real LinkedIn address
+    '''
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, connections: int = 100,
+                 search_pages: int = 3, per_page: int = 10) -> None:
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.connections = connections
+        self.search_pages = search_pages
+        self.per_page = per_page
+        self.stats = {"requests": 0, "invites": 0, "messages": 0}
+        self._lock = threading.Lock()
+        self.templates = {name[:-5]: load_fixture(name) for name in os.listdir(FIXTURES_PATH) if name.endswith(".html")}
+        self.url = "https://www.linkedin.com"
+        self.server = None
+        self._thread = None
+
+    def bind(self) -> ThreadingHTTPServer:
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.safe_handle(self)
+
+            def do_POST(self):
+                site.safe_handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self.server
+
+    def start(self) -> "BenchmarkSite":
+        '''
+        Serves the site from a background thread
+        '''
+        self.bind()
+        self._thread = threading.Thread(target=self.server.serve_forever, name="benchmark-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "BenchmarkSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def render(self, template: str, **values) -> str:
+        return self.templates[template].substitute(base=self.url, **values)
+
+    def connection_cards(self, start: int, count: int) -> str:
+        return "".join(self.render("connection_card", **get_person(index))
+                       for index in range(start, min(start + count, self.connections)))
+
+    def safe_handle(self, request: BaseHTTPRequestHandler) -> None:
+        try:
+            self.handle(request)
+        except Exception as e:
+            self.respond(request, 500, f"{type(e).__name__}: {e}", "text/plain")
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        if self.latency or self.jitter:
+            sleep(self.latency + random.uniform(0, self.jitter))
+        self.count("requests")
+        url = urlsplit(request.path)
+        logged_in = "li_at=" in (request.headers.get("Cookie") or "")
+        path = url.path.rstrip("/") or "/"
+
+        if request.command == "POST":
+            length = int(request.headers.get("Content-Length") or 0)
+            body = request.rfile.read(length).decode("utf-8", "replace")
+            if path == "/login":
+                return self.respond(request, 302, headers={"Location": "/feed/", "Set-Cookie": "li_at=benchmark; Path=/"})
+            if path == "/api/invite":
+                self.count("invites")
+                return self.respond(request, 200, "{}", "application/json")
+            if path == "/api/message":
+                self.count("messages")
+                return self.respond(request, 200, json.dumps({"received": len(body)}), "application/json")
+            return self.respond(request, 404, "Not found", "text/plain")
+
+        if path == "/login":
+            if logged_in:
+                return self.respond(request, 302, headers={"Location": "/feed/"})
+            return self.respond(request, 200, self.render("login"))
+        if not logged_in and path != "/":
+            return self.respond(request, 302, headers={"Location": "/login"})
+        html = self.render_path(request.path)
+        if html is None:
+            return self.respond(request, 404, "Not found", "text/plain")
+        return self.respond(request, 200, html)
+
+    def render_path(self, url: str) -> str | None:
+        '''
+        Returns the HTML a logged-in user gets for `url` (only its path and query are used), `None` if there is no such page
+        '''
+        url = urlsplit(url)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/") or "/"
+        if path in ("/", "/feed"):
+            return self.render("feed")
+        if path == "/search/results/people":
+            page = int(query.get("page", ["1"])[0])
+            if page > self.search_pages:
+                return self.render("search_empty")
+            start = (page - 1) * self.per_page
+            cards = "".join(self.render("search_card", **get_person(index)) for index in range(start, start + self.per_page))
+            return self.render("search", cards=cards)
+        if path == "/mynetwork/invite-connect/connections":
+            return self.render("connections", cards=self.connection_cards(0, self.per_page), total=self.connections)
+        if path == "/api/connections":
+            return self.connection_cards(int(query.get("start", ["0"])[0]), self.per_page)
+        if path.startswith("/in/"):
+            return self.render("profile", **get_person(int(path.rsplit("-", 1)[-1])))
+        if path == "/messaging/compose":
+            index = int(query.get("recipient", ["bench-person-0"])[0].rsplit("-", 1)[-1])
+            return self.render("messaging", **get_person(index))
+        return None
+
+    def respond(self, request: BaseHTTPRequestHandler, status: int, body: str = "", content_type: str = "text/html",
+                headers: dict | None = None) -> None:
+        data = body.encode("utf-8")
+        try:
+            request.send_response(status)
+            request.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            request.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                request.send_header(name, value)
+            request.end_headers()
+            request.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serves the offline LinkedIn stand-in site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds (0 to jitter) added to every response")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--search-pages", type=int, default=3)
+    args = parser.parse_args()
+    site = BenchmarkSite(args.port, args.latency, args.jitter, args.connections, args.search_pages)
+    site.bind()
+    print(f"Serving the benchmark site at {site.url}, set linkedin_url = \"{site.url}\" in config/settings.py to use it")
+    site.server.serve_forever()
@@ -3,6 +3,9 @@
 # Directory and name of the files where history of applied jobs is saved (Sentence after the last "/" will be considered as the file name).
 logs_folder_path = "logs/"
 
+# Address of LinkedIn, without a trailing "/". Only change this to run against the offline benchmark site (see benchmarks/README.md)
+linkedin_url = "https://www.linkedin.com"
+
 # If you want to see Chrome running then set run_in_background as False (May reduce performance).
 # True or False, Note: True or False are case-sensitive ,   If True, this will make pause_at_failed_question, pause_before_submit and run_in_background as False
 run_in_background = False
@@ -20,3 +23,96 @@ safe_mode = True
 # True or False, Note: True or False are case-sensitive
 stealth_mode = True
 
+
+# Number of Chrome sessions used to validate and message connections in parallel. Each worker gets its own profile directory inside logs_folder_path and reuses the login of the main browser.
+# Integer >= 1, 1 keeps the old single browser behaviour (Every extra worker costs a few hundred MB of RAM)
+worker_count = 1
+
+# Maximum size of log.txt in megabytes, after which it is moved to log-<date>.txt and a new one is started. Set 0 to disable size based rotation
+# Integer >= 0
+log_max_size_mb = 10
+
+# Maximum age of log.txt in hours before it is rotated. Set 0 to disable age based rotation
+# Integer >= 0
+log_max_age_hours = 24
+
+# Number of rotated log files to keep in logs_folder_path, older ones are deleted
+# Integer >= 0
+log_backup_count = 10
+
+# Gzip rotated log files to save disk space
+# True or False, Note: True or False are case-sensitive
+compress_old_logs = True
+
+# Validate profiles by downloading the profile page with the browser's cookies instead of opening it in a new tab (Much faster). Falls back to the browser if the page can't be parsed.
+# Experimental: only checked against sample pages so far. LinkedIn may render the current company in the browser only, then every profile costs an extra request before the fallback
+# True or False, Note: True or False are case-sensitive
+http_validation = False
+
+# Number of hours a validated profile (company, headline and whether it was skipped) is remembered, so reruns don't open it again. Changing SKIP_WORDS clears the remembered decisions. Set 0 to disable
+# Integer >= 0
+profile_cache_ttl_hours = 168
+
+# How SKIP_WORDS are matched against headlines and company names. Matching ignores case, accents in compatibility forms and extra spaces.
+# True: skip words must match whole words ("hr" skips "HR Manager" but not "Chrome"), False: skip words match anywhere in the text
+skip_words_whole_word = True
+
+# Send the message from the profile page that was opened for validation (its Message button), instead of loading the messaging page separately. If the profile has no Message button, the messaging page is loaded in a second tab while the profile is still being validated.
+# True or False, Note: True or False are case-sensitive
+single_visit_messaging = True
+
+# Load the next page of search results in a second tab while connection requests are sent on the current page.
+# True or False, Note: True or False are case-sensitive
+prefetch_search_pages = True
+
+# Save the LinkedIn login cookies in logs_folder_path/session after logging in, and reuse them in new browser sessions to skip the login form. Keep this folder private, anyone with these cookies is logged in as you!
+# True or False, Note: True or False are case-sensitive
+persist_session = True
+
+# Keep Chrome's disk cache in logs_folder_path/browser_cache between runs, so static files are not downloaded again on every launch
+# True or False, Note: True or False are case-sensitive
+persist_browser_cache = True
+
+# When driver.get() returns. "normal" waits for every image and script to load, "eager" returns once the page's HTML is parsed, "none" returns right away.
+# The bot waits for the elements it needs anyway, so "eager" is faster and safe. Options: "normal", "eager" or "none"
+page_load_strategy = "eager"
+
+# Don't download images, fonts, videos and tracking scripts on LinkedIn pages (Better for performance and bandwidth). Only the page structure is needed.
+# True or False, Note: True or False are case-sensitive
+block_heavy_resources = True
+
+# URL patterns blocked when block_heavy_resources is True ("*" matches anything)
+blocked_url_patterns = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*media.licdn.com/dms/image*",
+    "*px.ads.linkedin.com*", "*snap.licdn.com*", "*doubleclick.net*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*bat.bing.com*", "*facebook.net*", "*ads-twitter.com*",
+]
+
+# Pacing of connection requests ("invite") and messages ("message"). "burst" is how many can be sent back to back, "per_hour" and "per_day" cap the totals.
+# Remaining budgets are saved in logs_folder_path/rate_limits.json, so limits hold across runs. Integers >= 0, set a limit to 0 to disable it
+rate_limits = {
+    "invite": {"burst": 5, "per_hour": 20, "per_day": 80},
+    "message": {"burst": 3, "per_hour": 30, "per_day": 150},
+}
+
+# Random extra wait of 0 to rate_jitter seconds after each invite or message, so actions aren't evenly spaced
+# Number >= 0
+rate_jitter = 2.0
+
+# Longest wait in minutes for a rate limit to allow the next action. If the wait would be longer (e.g. the daily limit is used up), the run stops instead
+# Integer >= 0
+rate_max_wait_minutes = 60
+
+# Minutes to pause when LinkedIn shows a challenge or "too many requests" page before retrying the action
+# Integer >= 0
+throttle_pause_minutes = 15
+
+# Save latency percentiles of each stage, outcome counts and profiles per minute at the end of every run, to logs_folder_path/run_summary.json and a Prometheus textfile
+# True or False, Note: True or False are case-sensitive
+export_metrics = True
+
+# Where the Prometheus textfile is written, e.g. the --collector.textfile.directory of node exporter + "/linkedin_bot.prom". Leave empty for logs_folder_path/linkedin_bot.prom
+prometheus_textfile_path = ""
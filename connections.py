@@ -1,48 +1,84 @@
 from message import *
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-import pyautogui
-from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from config.personals import SEARCH_STRING
+from config.settings import prefetch_search_pages, linkedin_url
 from modules.open_chrome import *
 from modules.helpers import *
 from modules.clickers_and_finders import *
-import time
-
-
-def send_without_note_keyboard(driver):
-
-    driver.execute_script("""
-    const el =
-      document.querySelector('[role="dialog"] button') ||
-      document.querySelector('button.artdeco-button--primary');
-    if (el) el.focus();
-    """)
-
-    time.sleep(0.2)
-    driver.switch_to.active_element.send_keys(Keys.TAB)
-    driver.switch_to.active_element.send_keys(Keys.TAB)
-    driver.switch_to.active_element.send_keys(Keys.TAB)
-    time.sleep(3)
-    driver.switch_to.active_element.send_keys(Keys.ENTER)
-    time.sleep(1.5)
-
-
-def send_without_note_keyboard_alt(driver):
-
-    driver.execute_script("""
-    const el =
-      document.querySelector('[role="dialog"] button') ||
-      document.querySelector('button.artdeco-button--primary');
-    if (el) el.focus();
-    """)
-
-    time.sleep(0.2)
-    driver.switch_to.active_element.send_keys(Keys.TAB)
-    driver.switch_to.active_element.send_keys(Keys.TAB)
-    time.sleep(3)
-    driver.switch_to.active_element.send_keys(Keys.ENTER)
-    time.sleep(1.5)
+from modules.tabs import get_tab_manager
+from modules.rate_limiter import get_rate_governor
+from modules.metrics import metrics, timed
+from modules.retry import retry
+from modules.selector_registry import selector_registry
+
+
+# Sends the open invitation modal without a note in one call: finds the send button of whichever layout is shown and clicks it.
+# Returns "sent", or why nothing was sent ("no-dialog", "email-required", "unknown-layout"), in which case the modal is dismissed.
+SEND_INVITATION_JS = """
+const dialogs = document.querySelectorAll('[role="dialog"]');
+const dialog = dialogs[dialogs.length - 1];
+if (!dialog) return 'no-dialog';
+const buttons = [...dialog.querySelectorAll('button')];
+const label = button => ((button.getAttribute('aria-label') || '') + ' ' + button.innerText).trim().toLowerCase();
+const dismiss = () => {
+  const button = buttons.find(button => label(button).includes('dismiss'));
+  if (button) button.click();
+};
+if (dialog.querySelector('input[type="email"], input[name="email"]')) {
+  dismiss();
+  return 'email-required';
+}
+const send = buttons.find(button => label(button).includes('send without a note'))
+  || buttons.find(button => ['send', 'send now', 'send invitation'].includes(button.innerText.trim().toLowerCase()));
+if (!send || send.disabled) {
+  dismiss();
+  return 'unknown-layout';
+}
+send.click();
+return 'sent';
+"""
+
+
+# What a click on the Connect button `arguments[0]` led to: "dialog" if the invitation modal is shown,
+# "pending" if the button already reads Pending (invitation sent without a modal), else null while nothing happened yet
+INVITATION_STATE_JS = """
+const button = arguments[0];
+if ([...document.querySelectorAll('[role="dialog"]')].some(dialog => dialog.getClientRects().length)) return 'dialog';
+if (!button.isConnected) return null;
+const label = ((button.getAttribute('aria-label') || '') + ' ' + button.innerText).toLowerCase();
+return label.includes('pending') ? 'pending' : null;
+"""
+
+
+@timed("send_invitation")
+def send_invitation(driver, button, time: float = 5.0) -> bool:
+    '''
+    Finishes the invitation started by clicking the Connect `button`. Returns `True` only if the invitation was sent.
+    * If the invitation modal opens, clicks its send button directly with `SEND_INVITATION_JS` and waits for the modal to close
+    * If `button` reads Pending instead, LinkedIn sent the invitation without a modal
+    * If neither happens within `time` seconds, the click did nothing and `False` is returned
+    '''
+    try:
+        state = WebDriverWait(driver, time, poll_frequency=0.1, ignored_exceptions=[StaleElementReferenceException]).until(
+            lambda d: d.execute_script(INVITATION_STATE_JS, button))
+    except TimeoutException:
+        print_lg("Connect click had no visible effect, invitation not counted")
+        return False
+    if state == "pending":
+        print_lg("No invitation dialog, invitation was sent directly")
+        return True
+    result = driver.execute_script(SEND_INVITATION_JS)
+    if result != "sent":
+        print_lg(f"Didn't send invitation: {result}")
+        wait_for_dialog_closed(driver)
+        return False
+    if not wait_for_dialog_closed(driver):
+        print_lg("Invitation dialog didn't close after sending")
+        return False
+    return True
 
 
 def connect_alter_buttons(driver, buttons):
@@ -53,16 +89,20 @@ def connect_alter_buttons(driver, buttons):
                 if "connect" in btn.text.lower():
                     driver.execute_script(
                         "arguments[0].scrollIntoView({block:'center'});", btn)
-                    time.sleep(0.5)
-                    if btn.is_displayed() and btn.is_enabled():
-                        try:
-                            btn.click()
-                        except Exception:
-                            driver.execute_script(
-                                "arguments[0].click();", btn)
-
-                    send_without_note_keyboard_alt(driver)
-                    count += 1
+                    try:
+                        wait_for_clickable(driver, btn, 2)
+                    except Exception:
+                        continue
+                    if not get_rate_governor().acquire("invite"):
+                        break
+                    try:
+                        btn.click()
+                    except Exception:
+                        driver.execute_script(
+                            "arguments[0].click();", btn)
+
+                    if send_invitation(driver, btn):
+                        count += 1
             except Exception:
                 print_lg(f"Error clicking connect button")
                 continue
@@ -76,23 +116,20 @@ def add_profiles_from_page(driver, profile_divs) -> int:
     connection_count = 0
     for div in profile_divs:
         try:
-            connect_btn = None
-            try:
-                connect_btn = div.find_element(
-                    By.XPATH, './/button[.//span[text()="Connect"]]')
-            except Exception:
-                try:
-                    connect_btn = div.find_element(
-                        By.XPATH, './/a[.//span[text()="Connect"]]')
-                except Exception:
-                    continue
+            connect_btn = selector_registry.find_all(div, "connect_button")
+            if not connect_btn:
+                continue
+            connect_btn = connect_btn[0]
 
             driver.execute_script(
                 "arguments[0].scrollIntoView({block:'center'});", connect_btn
             )
-            time.sleep(0.5)
-            if not (connect_btn.is_displayed() and connect_btn.is_enabled()):
+            try:
+                wait_for_clickable(driver, connect_btn, 2)
+            except Exception:
                 continue
+            if not get_rate_governor().acquire("invite"):
+                break
 
             try:
                 connect_btn.click()
@@ -100,72 +137,111 @@ def add_profiles_from_page(driver, profile_divs) -> int:
                 driver.execute_script(
                     "arguments[0].click();", connect_btn)
             try:
-                time.sleep(2)
-                send_without_note_keyboard(driver)
-                connection_count += 1
+                if send_invitation(driver, connect_btn):
+                    connection_count += 1
             except Exception as e:
                 print_lg(f"Failed to connect: {e}")
         except Exception as e:
             print_lg(f"Error processing profile div: {e}")
             continue
+    return connection_count
+
+
+def get_search_url(page: int, query: str = SEARCH_STRING) -> str:
+    return f"{linkedin_url}/search/results/people/?keywords={query.replace(' ', '%20')}&page={page}"
+
+
+@retry()
+def open_search_page(driver: WebDriver, page: int, end: int | None, prefetched: int | None, query: str = SEARCH_STRING) -> int | None:
+    '''
+    Makes search results `page` the active tab and returns the page number now being prefetched, if any.
+    * With `prefetch_search_pages`, pages alternate between the "search-a" and "search-b" tabs:
+      `page` is shown in one while `page + 1` starts loading in the other. A prefetched page is only used once its tab reached it
+    * Else `page` is loaded in the current tab
+    '''
+    if not prefetch_search_pages:
+        load_page(driver, get_search_url(page, query))
+        return None
+    tabs = get_tab_manager(driver)
+    current, spare = ("search-a", "search-b") if page % 2 else ("search-b", "search-a")
+    url = get_search_url(page, query)
+    if prefetched == page:
+        tabs.switch(current)
+        # The tab keeps showing page - 2 until the preload commits, its cards must not be read as this page's
+        if not wait_for_url(driver, url, 10):
+            print_lg(f"Prefetched search page {page} didn't load, loading it again")
+            tabs.open(url, current)
+    else:
+        tabs.open(url, current)
+    if end is not None and page >= end:
+        return None
+    tabs.preload(get_search_url(page + 1, query), spare)
+    return page + 1
 
 
-def search_and_add_connections(driver, page=1, end=None) -> int:
+def search_and_add_connections(driver, page=1, end=None, query: str = SEARCH_STRING, interactive: bool = True) -> int:
     """
-    Searches for 'It Hr' on LinkedIn and sends connection requests safely.
+    Searches for `query` on LinkedIn and sends connection requests safely.
+    * With `interactive = False` it stops after page `end` instead of asking whether to search more pages
     """
     connection_count = 0
     print_lg(
-        f"Starting to search and add connections for '{SEARCH_STRING}' from page {page} to {end if end else 'end'}")
-    try:
-        while True and (end is None or page <= end):
-            search_url = f"https://www.linkedin.com/search/results/people/?keywords={SEARCH_STRING.replace(' ', '%20')}&page={page}"
-            driver.get(search_url)
-
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)
-
-            profile_divs = driver.find_elements(
-                By.XPATH, '//div[@data-view-name="edge-creation-connect-action"]'
-            )
-            print_lg(f"Found {len(profile_divs)} profiles on page {page}.")
-            if not profile_divs:
-                try:
-                    time.sleep(5)
-                    profile_divs = driver.find_elements(
-                        By.XPATH, '//button[contains(@aria-label, "to connect")]'
-                    )
-                    if not profile_divs:
-                        print_lg(f"No connect buttons found on page {page}.")
-                        page += 1
-                        continue
+        f"Starting to search and add connections for '{query}' from page {page} to {end if end else 'end'}")
+    prefetched = None
+    with metrics.run("search"):
+        try:
+            while True and (end is None or page <= end):
+                if get_rate_governor().exhausted("invite"):
+                    print_lg("Invite rate limit used up, stopping the search.")
+                    break
+                prefetched = open_search_page(
+                    driver, page, end, prefetched, query)
+
+                # Whichever shows up first: result cards, bare connect buttons or the empty results state
+                results = ["search_result_cards", "search_connect_buttons", "search_no_results"]
+                matched, _ = selector_registry.find_first(driver, results)
+                if matched == "search_no_results":
+                    print_lg(f"No more search results on page {page}.")
+                    break
+                wait_for_dom_stable(driver)
+
+                # Read again once rendering settled, the first match may have been a partial list
+                matched, profile_divs = selector_registry.find_first(driver, results[:2], 0)
+                if matched == "search_result_cards":
+                    print_lg(f"Found {len(profile_divs)} profiles on page {page}.")
+                    connection_count += add_profiles_from_page(
+                        driver, profile_divs)
+                elif matched == "search_connect_buttons":
                     print_lg(
                         f"Found {len(profile_divs)} profiles using alternative XPath.")
                     connection_count += connect_alter_buttons(
                         driver, profile_divs)
+                else:
+                    print_lg(f"No connect buttons found on page {page}.")
+                page += 1
+        except:
+            print_lg(f"Error during search and add connections")
+            return connection_count
+        finally:
+            # Later jobs use the home tab, also after an error on a prefetch tab
+            if prefetch_search_pages:
+                try:
+                    get_tab_manager(driver).go_home()
                 except Exception as e:
-                    print_lg(f"Error finding profile divs: {e}")
-            else:
-                connection_count += add_profiles_from_page(
-                    driver, profile_divs)
-            page += 1
-            time.sleep(2)
-    except:
-        print_lg(f"Error during search and add connections")
+                    print_lg(f"Couldn't switch back to the home tab: {e}")
+    if not interactive:
         return connection_count
-    else:
-        choice = pyautogui.confirm(
-            "Do you want to search for more connections?", buttons=["Yes", "No"])
-        if choice == "No":
-            return
-
-        count = pyautogui.prompt(
-            "Reached the end of page count. How many more pages u want to search? (Leave blank for no limit):", "Search Pages")
-        if count == "":
-            return search_and_add_connections(driver, page, None) + connection_count
-        if count and count.isdigit():
-            count = int(count)
-            if count > 0:
-                return search_and_add_connections(driver, page, page+count-1) + connection_count
-        else:
-            return connection_count
+    choice = show_confirm(
+        "Do you want to search for more connections?", buttons=["Yes", "No"], default="No")
+    if choice == "No":
+        return connection_count
+
+    count = show_prompt(
+        "Reached the end of page count. How many more pages u want to search? (Leave blank for no limit):", "Search Pages")
+    if count == "":
+        return search_and_add_connections(driver, page, None, query) + connection_count
+    if count and count.isdigit():
+        count = int(count)
+        if count > 0:
+            return search_and_add_connections(driver, page, page+count-1, query) + connection_count
+    return connection_count
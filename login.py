@@ -3,12 +3,14 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 import os
 from dotenv import load_dotenv
-import pyautogui
 from modules.open_chrome import *
 from modules.helpers import *
 from modules.clickers_and_finders import *
 from connections import *
 from config.text import welcome_message_text
+from modules.session_store import save_session, load_session, clear_session
+from modules.metrics import timed
+from config.settings import linkedin_url
 # Load environment variables from .env file
 load_dotenv()
 
@@ -18,7 +20,8 @@ def is_logged_in_LN() -> bool:
     Function to check if user is logged-in in LinkedIn
     * Returns: `True` if user is logged-in or `False` if not
     '''
-    if driver.current_url == "https://www.linkedin.com/feed/":
+    driver = get_driver()
+    if driver.current_url == f"{linkedin_url}/feed/":
         return True
     if try_linkText(driver, "Sign in"):
         return False
@@ -36,32 +39,59 @@ def check_logged_in_LN(driver: WebDriver) -> bool:
     * If not logged-in, returns `False`
     * If logged-in, returns `True`
     '''
-    if driver.current_url == "https://www.linkedin.com/feed/":
+    if driver.current_url == f"{linkedin_url}/feed/":
         return True
     return False
 
 
+def wait_for_login_page(driver: WebDriver, time: float = 10.0) -> str | None:
+    '''
+    Waits for a max of `time` seconds after opening the login page, until it's known whether the session is logged in.
+    * Returns "feed" if LinkedIn redirected to the feed, "login" once the login form is shown, else `None`
+    * Checks the URL and the form, not just `readyState`, which is already "complete" on the page shown before
+    '''
+    def _state(driver):
+        if check_logged_in_LN(driver):
+            return "feed"
+        if url_matches(driver.current_url, f"{linkedin_url}/login") and driver.find_elements(By.ID, "password"):
+            return "login"
+        return False
+    try:
+        return WebDriverWait(driver, time, poll_frequency=0.2).until(_state)
+    except TimeoutException:
+        return None
+
+
+@timed("login")
 def login_LN(username: str, password: str) -> None:
     '''
     Function to login for LinkedIn
     * Tries to login using given `username` and `password` from .env file
     * If failed, tries to login using saved LinkedIn profile button if available
     * If both failed, asks user to login manually
+    * Skips all of the above if the session restored by `restart_driver` is still logged in, and saves the session after a login
     '''
     # Find the username and password fields and fill them with user credentials
     global driver
-    driver.get("https://www.linkedin.com/login")
-    if check_logged_in_LN(driver):
+    driver = get_driver()
+    driver.get(f"{linkedin_url}/login")
+    page = wait_for_login_page(driver)
+    if page == "feed":
         print_lg("Already logged in!")
+        save_session(driver)
         return driver
+    # Only a login form we were sent back to proves the saved session is no longer accepted
+    if page == "login" and load_session():
+        print_lg("Saved LinkedIn session was rejected, deleting it")
+        clear_session()
     if username == "username@example.com" and password == "example_password":
-        pyautogui.alert(
+        show_alert(
             "User did not configure username and password in .env file, hence can't login automatically! Please login manually!", "Login Manually", "Okay")
         print_lg("User did not configure username and password in .env file, hence can't login automatically! Please login manually!")
         manual_login_retry(is_logged_in_LN, 2)
         return
     try:
-        wait.until(EC.presence_of_element_located(
+        get_wait().until(EC.presence_of_element_located(
             (By.LINK_TEXT, "Forgot password?")))
         try:
             text_input_by_ID(driver, "username", username, 1)
@@ -83,8 +113,9 @@ def login_LN(username: str, password: str) -> None:
 
     try:
         # Wait until successful redirect, indicating successful login
-        wait.until(EC.url_to_be("https://www.linkedin.com/feed/"))
+        get_wait().until(EC.url_to_be(f"{linkedin_url}/feed/"))
         print_lg("Login successful!")
+        save_session(driver)
     except Exception as e:
         print_lg("Seems like login attempt failed! Possibly due to wrong credentials or already logged in! Try logging in manually!")
         manual_login_retry(is_logged_in_LN, 2)
@@ -93,17 +124,17 @@ def login_LN(username: str, password: str) -> None:
 
 
 def make_choice(driver: WebDriver):
-    choice = pyautogui.confirm("Choose an action:", buttons=[
+    choice = show_confirm("Choose an action:", buttons=[
         "Search and Add Connections", "Send Messages"])
     if choice == "Search and Add Connections":
-        page_count = pyautogui.prompt(
+        page_count = show_prompt(
             "Enter number of pages to search for connections (Leave blank for no limit):", "Search Pages")
         if page_count and page_count.isdigit():
             page_count = int(page_count)
         else:
             page_count = None
         connection_count = search_and_add_connections(driver, 1, page_count)
-        pyautogui.alert(
+        show_alert(
             text=f"Finished searching and adding connections for '{SEARCH_STRING}'. Added {connection_count} connections.", title="Connections successfully added", button="OK")
     elif choice == "Send Messages":
         print_lg("Sending messages to connections...")
@@ -120,38 +151,39 @@ def main():
     if not email or not password:
         error_msg = "Error: Please set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env file"
         print(error_msg)
-        pyautogui.alert(error_msg, title="Missing Credentials")
+        show_alert(error_msg, title="Missing Credentials")
         return
     try:
+        driver = get_driver()
         try:
             driver = login_LN(email, password)
 
         except Exception:
-            pyautogui.alert(
+            show_alert(
                 "An error occurred during login. Please try again.", "Login Error", "OK"
             )
         make_choice(driver)
     except Exception as e:
         print_lg(f"Error in main function")
     finally:
-        choice = pyautogui.confirm(
-            "Do you want to quit now?", buttons=["Yes", "No"])
+        choice = show_confirm(
+            "Do you want to quit now?", buttons=["Yes", "No"], default="Yes")
         if choice == "No":
             ''' if driver is closed reopen it '''
             try:
                 print_lg("Reopening the browser...", driver)
-                driver.get("https://www.linkedin.com/feed/")
+                driver.get(f"{linkedin_url}/feed/")
             except Exception as e:
                 print_lg(f"Couldn't reopen the browser! Error: {e}")
                 options, driver, actions, wait = restart_driver()
                 print_lg("Reopened the browser!", driver)
-            driver.get("https://www.linkedin.com/feed/")
+            driver.get(f"{linkedin_url}/feed/")
             main()
 
         # Close the browser
         print_lg("Closing the browser...")
         driver.quit()
-        pyautogui.alert(
+        show_alert(
             text=welcome_message_text,
             title="Automation Complete ✅",
             button="Awesome!"
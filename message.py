@@ -1,54 +1,102 @@
-import pyautogui
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from config.text import message_text
-from config.personals import skip_words, message_start_index, message_end_index, message_count
+from config.personals import message_start_index, message_end_index, message_count
 from modules.open_chrome import *
 from modules.helpers import *
 from modules.clickers_and_finders import *
-import time
+from modules.worker_pool import BrowserPool, open_worker_pool
+from modules.seen_store import get_seen_store, canonical_profile_id
+from modules.profile_fetcher import get_profile_fetcher
+from modules.profile_cache import get_profile_cache
+from modules.skip_words import skip_matcher
+from modules.tabs import get_tab_manager
+from modules.pipeline import Pipeline
+from modules.rate_limiter import get_rate_governor
+from modules.metrics import metrics, timed
+from modules.retry import retry, classify
+from modules.selector_registry import selector_registry
+from modules.checkpoint import new_checkpoint, save_checkpoint, load_checkpoint
+from config.settings import http_validation, single_visit_messaging, linkedin_url
+import threading
+from typing import Iterator
 
 seen_profiles = set()
 counts = 0
-csv_profiles = get_profiles_from_csv()
-
-
-def check_save_seen_profiles(profile_link: str):
-    global csv_profiles
-    csv_profiles.add(profile_link)
-    save_seen_profiles(profile_link)
-
-
-def send_message(driver: WebDriver):
-    wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    time.sleep(5)
+in_flight_profiles = set()
+browser_locks = {}
+run_state = new_checkpoint(None, None, None)
+state_lock = threading.Lock()
+
+CONNECTION_CARD_XPATH = '//div[@data-view-name="connections-list"]'
+PROFILE_MESSAGE_XPATH = '//main//button[.//span[text()="Message"]] | //main//a[.//span[text()="Message"]]'
+CHAT_BUBBLE_XPATH = '//div[contains(@class, "msg-overlay-conversation-bubble")]'
+# Closes every chat bubble of the messaging overlay, so bubbles restored from earlier profiles can't be mistaken for a new one
+CLOSE_CHAT_BUBBLES_JS = """
+document.querySelectorAll('.msg-overlay-conversation-bubble').forEach(bubble => {
+  const close = [...bubble.querySelectorAll('button')].find(button => (button.innerText + ' ' + (button.getAttribute('aria-label') || '')).toLowerCase().includes('close your'));
+  if (close) close.click(); else bubble.remove();
+});
+"""
+
+# Reads every connection card from `arguments[0]` onwards in a single WebDriver call
+EXTRACT_CARDS_JS = """
+const cards = document.querySelectorAll('div[data-view-name="connections-list"]');
+const records = [];
+for (let i = arguments[0] || 0; i < cards.length; i++) {
+  const card = cards[i];
+  const profile = card.querySelector('a[data-view-name="connections-profile"]');
+  const message = card.querySelector('div[data-view-name="message-button"] a[aria-label="Message"]');
+  const lines = (card.innerText || '').split('\\n').map(line => line.trim()).filter(Boolean);
+  records.push({
+    index: i,
+    profile_link: profile ? profile.href : null,
+    message_link: message ? message.href : null,
+    name: lines[0] || '',
+    headline: lines[1] || '',
+  });
+}
+return records;
+"""
+
+
+def check_save_seen_profiles(profile_link: str, outcome: str = "messaged"):
+    get_seen_store().add(profile_link, outcome, commit=outcome == "messaged")
+
+
+@retry()
+@timed("send_message")
+def send_message(driver: WebDriver, container: str = ""):
+    '''
+    Sends `message_text` in the conversation shown on the current page, unless the headline matches skip words or there is already a conversation.
+    * `container` is an XPath that limits every lookup to one conversation, e.g. the chat bubble a Message click opened on a profile page
+    '''
+    wait_for_any(driver, [
+        f'{container}//div[contains(@class,"msg-s-message-list")]',
+        f'{container}//div[contains(@class, "msg-form__contenteditable")]',
+    ], 10)
+    wait_for_dom_stable(driver)
     try:
         text = driver.find_element(
-            By.XPATH, './/div[contains(@class,"artdeco-entity-lockup__subtitle")]').text
-        if text and any(skip_word.strip() in text.lower() for skip_word in skip_words):
-            print_lg("Skipping profile")
+            By.XPATH, f'{container}//div[contains(@class,"artdeco-entity-lockup__subtitle")]').text
+        if text in skip_matcher:
+            print_lg(f"Skipping profile, headline matched '{skip_matcher.search(text)}'")
             return
     except Exception:
         print_lg("Title not found, skipping")
-    try:
-        driver.find_element(
-            By.XPATH, './/div[contains(@class,"msg-s-message-list")]')
-    except Exception:
-        try:
-            text_input = driver.find_element(
-                By.XPATH,
-                './/div[contains(@class, "msg-form__contenteditable")]'
-            )
-            text_input.click()
-            text_input.send_keys(message_text)
-            send_button = driver.find_element(
-                By.XPATH,
-                './/button[contains(@class, "msg-form__send-button")]'
-            )
-            time.sleep(5)
-            send_button.click()
-        except Exception as e:
-            print_lg("Could not send message, skipping", e)
-            time.sleep(5)
+    if count_elements(driver, f'{container}//div[contains(@class,"msg-s-message-list")]'):
+        return
+    text_input = driver.find_element(
+        By.XPATH,
+        f'{container}//div[contains(@class, "msg-form__contenteditable")]'
+    )
+    text_input.click()
+    # A retry can come back with the message already typed, don't type it twice
+    if not text_input.text.strip():
+        text_input.send_keys(message_text)
+    send_button = wait_for_clickable(
+        driver, f'{container}//button[contains(@class, "msg-form__send-button")]')
+    send_button.click()
 
 
 def message_connections(driver: WebDriver, cards: list):
@@ -59,7 +107,6 @@ def message_connections(driver: WebDriver, cards: list):
             driver.execute_script(
                 "arguments[0].scrollIntoView({block:'center'});", card
             )
-            time.sleep(0.3)
             message_link = card.find_element(
                 By.XPATH,
                 './/div[@data-view-name="message-button"]//a[@aria-label="Message"]'
@@ -73,28 +120,15 @@ def message_connections(driver: WebDriver, cards: list):
 
             seen_profiles.add(href)
 
-            driver.execute_script("window.open(arguments[0], '_blank');", href)
-
-            driver.switch_to.window(driver.window_handles[-1])
-            retry = 0
+            tabs = get_tab_manager(driver)
             try:
-                while True:
-                    try:
-                        send_message(driver)
-                        break
-                    except:
-                        if retry >= 3:
-                            raise Exception(
-                                "Max retries reached for sending message")
-                        print_lg("Retrying to send message...")
-                        time.sleep(2)
-                        retry += 1
+                tabs.open(href)
+                send_message(driver)
             except Exception as e:
                 print_lg("Failed to send message:", e)
 
             finally:
-                driver.close()
-                driver.switch_to.window(driver.window_handles[0])
+                tabs.go_home()
 
         except Exception:
             print_lg("Message button not rendered yet, skipping")
@@ -103,31 +137,76 @@ def message_connections(driver: WebDriver, cards: list):
 
 def message_connection(driver: WebDriver, href: str):
     global seen_profiles
-    try:
-        if href in seen_profiles:
+    if href in seen_profiles:
+        return
+
+    seen_profiles.add(href)
+
+    with get_tab_manager(driver).use(href):
+        return send_message(driver)
+
+
+def message_from_profile(driver: WebDriver, profile_link: str, message_link: str):
+    '''
+    Sends the message without loading another page when possible.
+    * If the messaging page was preloaded by `validate_profile_in_browser`, sends from that tab once it has really loaded `message_link`
+    * Else if the profile is still open in the worker tab, sends through its Message action. Open chat bubbles are closed first,
+      so the lookups of `send_message` only see the bubble this click opens (or the messaging page it navigates to)
+    * Else falls back to `message_connection`
+    '''
+    tabs = get_tab_manager(driver)
+    if message_link in seen_profiles:
+        return
+    for name, ready_url, action in (("message", message_link, None), ("worker", profile_link, PROFILE_MESSAGE_XPATH)):
+        if tabs.urls.get(name) != ready_url:
+            continue
+        try:
+            with tabs.use(name=name):
+                # The preload only started the navigation, the tab may still show the previous conversation
+                if not action and not wait_for_url(driver, message_link):
+                    raise TimeoutException(f"Tab is still on {driver.current_url}")
+                container = ""
+                if action:
+                    driver.execute_script(CLOSE_CHAT_BUBBLES_JS)
+                    wait_for_clickable(driver, action, 2).click()
+                    matched, _ = wait_for_any(driver, [CHAT_BUBBLE_XPATH, '//div[contains(@class, "msg-form__contenteditable")]'], 5)
+                    if matched == CHAT_BUBBLE_XPATH:
+                        container = f"({CHAT_BUBBLE_XPATH})[last()]"
+                send_message(driver, container)
+            seen_profiles.add(message_link)
             return
-
-        seen_profiles.add(href)
-
-        driver.execute_script("window.open(arguments[0], '_blank');", href)
-        driver.switch_to.window(driver.window_handles[-1])
-
-        retry = 0
-        while retry < 3:
-            try:
-                return send_message(driver)
-            except Exception:
-                print_lg("Retrying to send message...")
-                retry += 1
-                time.sleep(2)
-    except Exception:
-        print_lg("Message button not rendered yet, skipping")
-    finally:
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-
-
+        except Exception as e:
+            print_lg(f"Couldn't message from the {name} tab, loading messaging page: {e}")
+        break
+    message_connection(driver, message_link)
+
+
+# Clicks "Load more" (or scrolls if there is none) and returns the number of loaded cards, in one call
+LOAD_MORE_JS = """
+const button = [...document.querySelectorAll('button')].find(button => button.innerText.trim() === 'Load more');
+if (button) button.click(); else window.scrollTo(0, document.body.scrollHeight);
+return document.querySelectorAll('div[data-view-name="connections-list"]').length;
+"""
+
+
+def fast_forward_connections(driver: WebDriver, target: int) -> int:
+    '''
+    Loads the connections list until more than `target` cards exist, without reading any of them. Returns the number of loaded cards.
+    * One `execute_script` per load, stops early if 3 loads in a row add nothing
+    '''
+    loaded = count_elements(driver, CONNECTION_CARD_XPATH)
+    misses = 0
+    while loaded <= target and misses < 3:
+        before = driver.execute_script(LOAD_MORE_JS)
+        loaded = wait_for_more_elements(driver, CONNECTION_CARD_XPATH, before)
+        misses = misses + 1 if loaded <= before else 0
+        print_lg(f"Loaded {loaded} connections, skipping to {target}")
+    return loaded
+
+
+@timed("scroll_to_bottom")
 def scroll_to_bottom(driver: WebDriver):
+    card_count = count_elements(driver, CONNECTION_CARD_XPATH)
     try:
         load_more_button = driver.find_element(
             By.XPATH,
@@ -136,192 +215,455 @@ def scroll_to_bottom(driver: WebDriver):
         driver.execute_script(
             "arguments[0].scrollIntoView({block:'center'});", load_more_button
         )
-        time.sleep(1)
-        load_more_button.click()
+        wait_for_clickable(driver, load_more_button, 2).click()
         print_lg("Clicked Load More button")
     except Exception:
         driver.execute_script(
             "window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
-
-
-def open_and_validate_profile(driver: WebDriver, profile_link: str) -> bool:
-    global csv_profiles
-    driver.execute_script("window.open(arguments[0], '_blank');", profile_link)
-    driver.switch_to.window(driver.window_handles[-1])
+    wait_for_more_elements(driver, CONNECTION_CARD_XPATH, card_count)
+
+
+@timed("validate_over_http")
+def validate_profile_over_http(driver: WebDriver, profile_link: str) -> tuple[bool, str | None] | None:
+    '''
+    Validates `profile_link` from its HTML, fetched with the cookies of `driver`.
+    * Returns `(decision, company)` like `validate_profile_in_browser`, or `None` if the page couldn't be used
+    '''
+    profile = get_profile_fetcher(driver).fetch(profile_link)
+    if profile is None:
+        return None
+    company = profile["company"] or profile["experience_company"]
+    if company is None:
+        # Experience section exists but has no company link, same as the browser path
+        return True, None
+    if company in skip_matcher:
+        print_lg(f"Skipping company: {company} for {profile_link}")
+        check_save_seen_profiles(profile_link, "skipped_company")
+        return False, company
+    return True, company
+
+
+@timed("open_and_validate_profile")
+def open_and_validate_profile(driver: WebDriver, profile_link: str, headline: str | None = None, message_link: str | None = None) -> bool:
+    '''
+    Returns `True` if the connection at `profile_link` should be messaged.
+    * Reuses the decision from `profile_cache` if the profile was validated within `profile_cache_ttl_hours`
+    * Else uses `validate_profile_over_http` first if `http_validation` is on, and the browser tab only if that fails
+    * `message_link` is passed on to `validate_profile_in_browser` for preloading
+    '''
+    cached = get_profile_cache(skip_matcher.fingerprint).get(profile_link)
+    if cached:
+        print_lg(
+            f"Using cached validation for {profile_link}: {cached['company']} -> {'message' if cached['decision'] else 'skip'}")
+        if not cached["decision"]:
+            check_save_seen_profiles(profile_link, "skipped_company")
+        return cached["decision"]
+
+    result = None
+    if http_validation:
+        result = validate_profile_over_http(driver, profile_link)
+        if result is None:
+            print_lg(f"Falling back to browser validation for {profile_link}")
+    if result is None:
+        result = validate_profile_in_browser(
+            driver, profile_link, message_link)
+    decision, company = result
+    get_profile_cache(skip_matcher.fingerprint).put(
+        profile_link, company, headline, decision)
+    return decision
+
+
+@retry()
+@timed("validate_in_browser")
+def validate_profile_in_browser(driver: WebDriver, profile_link: str, message_link: str | None = None) -> tuple[bool, str | None]:
+    '''
+    Validates `profile_link` in the worker tab of `driver`. Returns `(decision, company)`, `company` is `None` if it wasn't found.
+    * If `message_link` is given and the profile has no Message action, the messaging page is preloaded in the "message" tab while validation continues
+    * Raises `TimeoutException` if neither the current company nor the Experience section showed up
+    '''
+    tabs = get_tab_manager(driver)
     try:
-        # Ensure page is loaded
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
-
-        # 🔥 BEST WAY: Current company via aria-label
-        company_btn = wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH,
-                 '//button[contains(@aria-label,"Current company:")]')
-            )
-        )
-        scroll_page(driver)
-        scroll_to_top(driver)
-        time.sleep(2)
-        aria = company_btn.get_attribute("aria-label")
+        tabs.open(profile_link)
+        # 🔥 BEST WAY: Current company via aria-label, else the Experience section. One shared wait for both.
+        matched, found = selector_registry.find_first(
+            driver, ["profile_company", "profile_experience"])
+        if message_link and not count_elements(driver, PROFILE_MESSAGE_XPATH):
+            tabs.preload(message_link, "message")
+        if matched is None:
+            # Could just be a slow page: let `retry` load it again, and never remember it as skipped
+            raise TimeoutException(
+                f"Neither current company nor experience found for {profile_link}")
+
+        if matched == "profile_company":
+            aria = found[0].get_attribute("aria-label")
+            company = aria.split("Current company:")[1].split(".")[0].strip()
+        else:
+            # 🧠 Fallback: first company in the Experience section
+            try:
+                company = found[0].find_element(
+                    By.XPATH, './/a[contains(@href,"/company/")][.//p]').text.strip()
+                company = company.split("\n")[1].split("·")[0].strip()
+            except Exception:
+                print_lg(
+                    f"Could not extract company from Experience section for {profile_link}, but section exists. Proceeding with messaging.")
+                return True, None
 
-        company = aria.split("Current company:")[1].split(".")[0].strip()
-        if company.lower() in skip_words:
+        if company in skip_matcher:
             print_lg(f"Skipping company: {company} for {profile_link}")
-            check_save_seen_profiles(profile_link)
-            return False
+            check_save_seen_profiles(profile_link, "skipped_company")
+            return False, company
+        return True, company
 
-        return True
+    finally:
+        tabs.go_home()
 
-    except Exception:
-        # 🧠 Fallback: check if Experience section exists
-        try:
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//section[.//span[text()="Experience"]]')
-                )
-            )
-            return True
 
-        except Exception:
-            try:
-                time.sleep(2)
-                experience_section = driver.find_element(
-                    By.XPATH, '//section[.//h2[text()="Experience"]]')
-                if experience_section:
-                    try:
-                        company = driver.find_element(
-                            By.XPATH,
-                            '(//section[.//h2[text()="Experience"]]//a[contains(@href,"/company/")][.//p])[1]'
-                        ).text.strip()
-                        company = company.split("\n")[1].split("·")[0].strip()
-                        if company.lower() in skip_words:
-                            print_lg(
-                                f"Skipping company: {company} for {profile_link}")
-                            check_save_seen_profiles(profile_link)
-                            return False
-                        return True
-                    except Exception:
-                        print_lg(
-                            f"Could not extract company from Experience section for {profile_link}, but section exists. Proceeding with messaging.")
-                        return True
-            except Exception:
-                print_lg(
-                    f"Neither current company nor experience found for {profile_link}")
-                check_save_seen_profiles(profile_link)
+@retry()
+def extract_connection_cards(driver: WebDriver, start: int = 0) -> list[dict]:
+    '''
+    Returns the connection cards from index `start` onwards as plain dicts, read in one `execute_script` call.
+    * Keys: `index`, `profile_link`, `message_link`, `name`, `headline`
+    * Links are `None` if the card has not rendered them yet
+    '''
+    return driver.execute_script(EXTRACT_CARDS_JS, start) or []
+
+
+def limit_reached() -> bool:
+    return message_count is not None and counts >= message_count
+
+
+def claim_profile(profile_link: str) -> bool:
+    '''
+    Reserves `profile_link` for the calling worker.
+    * Returns `False` if it was already messaged, is being processed by another worker or the message limit is reached
+    '''
+    profile_id = canonical_profile_id(profile_link)
+    with state_lock:
+        if profile_id in in_flight_profiles or limit_reached() or profile_link in get_seen_store():
             return False
+        in_flight_profiles.add(profile_id)
+        return True
 
-    finally:
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
 
+def release_profile(profile_link: str) -> None:
+    with state_lock:
+        in_flight_profiles.discard(canonical_profile_id(profile_link))
 
-def check_profile(driver: WebDriver, cards: list):
-    global csv_profiles
-    global counts
-    for card in cards:
-        if message_count is not None and counts >= message_count:
-            print_lg(f"Reached message limit of {message_count}, stopping.")
-            break
-        try:
-            profile_link = card.find_element(
-                By.XPATH, './/a[@data-view-name="connections-profile"]').get_attribute("href")
-            if profile_link in csv_profiles:
-                print_lg(f"Already messaged profile: {profile_link}, skipping")
-                continue
-            message_link = card.find_element(
-                By.XPATH,
-                './/div[@data-view-name="message-button"]//a[@aria-label="Message"]'
-            ).get_attribute("href")
-
-            if open_and_validate_profile(driver, profile_link):
-                time.sleep(2)
-                # scroll to card
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block:'center'});", card
-                )
-                time.sleep(2)
-                message_connection(driver, message_link)
-                counts += 1
-                check_save_seen_profiles(profile_link)
-                time.sleep(2)
-        except Exception:
-            print_lg("Error checking profile, skipping")
+
+def update_cursor() -> None:
+    '''
+    Moves `run_state["cursor"]` to the first card that is not fully processed. Call with `state_lock` held.
+    '''
+    run_state["cursor"] = min(run_state["in_flight"], default=run_state["harvested"])
 
 
-def find_connections(driver: WebDriver, start_index=None, end_index=None, message_limit=None):
-    search_url = "https://www.linkedin.com/mynetwork/invite-connect/connections/"
-    driver.get(search_url)
+def get_browser_lock(driver: WebDriver) -> threading.Lock:
+    '''
+    Returns the lock that must be held while using `driver`, as pipeline stages share browsers across threads
+    '''
+    with state_lock:
+        return browser_locks.setdefault(driver, threading.Lock())
 
-    wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    time.sleep(3)
-    retry = old_length = 0
-    cards = []
-    while retry < 3:
+
+# < Messaging pipeline stages
+def harvest_stage(driver: WebDriver, start_index: int | None, end_index: int | None) -> Iterator[dict]:
+    '''
+    Source stage, yields connection cards one by one. `driver` is only locked while the list is read or scrolled.
+    '''
+    batches = harvest_connection_cards(driver, start_index, end_index)
+    lock = get_browser_lock(driver)
+    try:
+        while True:
+            with lock:
+                cards = next(batches, None)
+            if cards is None:
+                return
+            print_lg(
+                f"Processing connections from {cards[0]['index']} to {cards[-1]['index'] + 1}")
+            with state_lock:
+                run_state["harvested"] = cards[-1]["index"] + 1
+                update_cursor()
+            yield from cards
+    finally:
+        with lock:
+            batches.close()
+
+
+def filter_stage(_, card: dict) -> dict | None:
+    '''
+    Drops cards without links, already seen profiles and headlines matching skip words, and claims the rest
+    '''
+    profile_link = card["profile_link"]
+    if not profile_link or not card["message_link"]:
+        print_lg(f"Message button not rendered yet for card {card['index']}, skipping")
+        metrics.count("profile", "skipped", "no_message_button")
+        return None
+    if profile_link in get_seen_store():
+        print_lg(f"Already messaged profile: {profile_link}, skipping")
+        metrics.count("profile", "skipped", "seen")
+        return None
+    if card["headline"] in skip_matcher:
+        print_lg(
+            f"Skipping {profile_link}, headline matched '{skip_matcher.search(card['headline'])}'")
+        check_save_seen_profiles(profile_link, "skipped_headline")
+        metrics.count("profile", "skipped", "headline")
+        return None
+    if not claim_profile(profile_link):
+        return None
+    with state_lock:
+        run_state["in_flight"][card["index"]] = profile_link
+    return card
+
+
+def over_limit(message_limit: int | None) -> bool:
+    '''
+    Returns `True` if no more messages may be sent in this run. Call with `state_lock` held.
+    '''
+    return limit_reached() or (message_limit is not None and counts >= message_limit)
+
+
+def failure_outcome(e: Exception, stage: str) -> tuple[str, str]:
+    '''
+    Returns `(outcome, reason)` of a card whose `stage` raised `e`. A lost browser session is "aborted", the card wasn't really tried.
+    '''
+    if classify(e) == "dead_session":
+        return "aborted", "dead_session"
+    return "error", f"{stage}:{type(e).__name__}"
+
+
+def validate_stage(context: tuple[WebDriver, Pipeline, int | None], card: dict) -> dict:
+    '''
+    Validates the profile on the driver of `context` (`(driver, pipeline, message_limit)`). If it should be messaged, the browser lock
+    stays held and is handed to `message_stage` with the card, so the message is sent from the same browser (see `single_visit_messaging`).
+    * Cards still queued once the limit is reached or the pipeline stopped get outcome "limit" without loading their profile
+    '''
+    driver, pipeline, message_limit = context
+    with state_lock:
+        reason = "message_count" if over_limit(message_limit) else "stopped" if pipeline.stopped else None
+    if reason:
+        card["outcome"], card["reason"] = "limit", reason
+        return card
+    lock = get_browser_lock(driver)
+    lock.acquire()
+    card["driver"] = driver
+    try:
+        valid = open_and_validate_profile(
+            driver, card["profile_link"], card["headline"], card["message_link"] if single_visit_messaging else None)
+        if not valid:
+            card["outcome"], card["reason"] = "skipped", "profile"
+    except Exception as e:
+        print_lg(f"Error checking profile {card['profile_link']}, skipping: {e}")
+        card["outcome"], card["reason"] = failure_outcome(e, "validate")
+    if "outcome" in card:
+        lock.release()
+    return card
+
+
+def message_stage(message_limit: int | None, card: dict) -> dict:
+    '''
+    Messages a validated card on the browser it was validated on, and releases that browser's lock
+    '''
+    global counts
+    if "outcome" in card:
+        return card
+    driver = card["driver"]
+    try:
+        with state_lock:
+            if over_limit(message_limit):
+                card["outcome"], card["reason"] = "limit", "message_count"
+                return card
+            counts += 1
+        if not get_rate_governor().acquire("message"):
+            card["outcome"], card["reason"] = "limit", "rate_limit"
+            with state_lock:
+                counts -= 1
+            return card
         try:
-            # ✅ get actual connection cards
-            old_length = len(cards)  # Store the length of the previous cards
-            cards = driver.find_elements(
-                By.XPATH,
-                '//div[@data-view-name="connections-list"]'
-            )
-            print_lg(f"Total connections found so far: {len(cards)}")
-            if len(cards) > old_length:
-                retry = 0  # Reset retry if new cards are found
-            elif len(cards) == old_length and len(cards) > 0:
-                break  # Exit if no new cards are found
-            # Process only new cards
-            if start_index is not None or end_index is not None:
-                start = old_length
-                end = len(cards)
-                if start_index is not None:
-                    if start_index >= len(cards):
-                        scroll_to_bottom(driver)
-                        continue
-                    start = old_length if start_index < old_length else start_index
-                end = end_index if end_index is not None and end_index <= len(
-                    cards) else len(cards)
-                print_lg(
-                    f"Processing connections from {start} to {end} {len(cards)}")
-                check_profile(driver, cards[start:end])
-                if end_index is not None and end_index < len(cards):
-                    break  # Exit if we've reached the end
+            if single_visit_messaging:
+                message_from_profile(
+                    driver, card["profile_link"], card["message_link"])
             else:
-                check_profile(driver, cards[old_length:])
-            if message_limit is not None and counts >= message_limit:
-                print_lg(
-                    f"Reached message limit of {message_limit}, stopping.")
-                break
-            # Scroll to the bottom to load all connections
+                message_connection(driver, card["message_link"])
+            card["outcome"] = "messaged"
+        except Exception as e:
+            print_lg(f"Failed to message {card['profile_link']}: {e}")
+            card["outcome"], card["reason"] = failure_outcome(e, "message")
+            with state_lock:
+                counts -= 1
+        return card
+    finally:
+        get_browser_lock(driver).release()
+
+
+def record_stage(pipeline: Pipeline, card: dict) -> dict:
+    '''
+    Saves the outcome of a card, releases its claim and stops the pipeline once the message limit is reached or the browser session is lost
+    '''
+    card.pop("driver", None)
+    if card["outcome"] == "messaged":
+        check_save_seen_profiles(card["profile_link"])
+    release_profile(card["profile_link"])
+    metrics.count("profile", card["outcome"], card.get("reason"))
+    with state_lock:
+        # Cards turned away by the limit or a lost session weren't processed, they keep the cursor at them for a resumed run
+        if card["outcome"] not in ("limit", "aborted"):
+            run_state["in_flight"].pop(card["index"], None)
+        run_state["outcomes"][card["outcome"]] = run_state["outcomes"].get(card["outcome"], 0) + 1
+        run_state["last_profile_id"] = canonical_profile_id(card["profile_link"])
+        update_cursor()
+        save_checkpoint(run_state)
+    if card["outcome"] == "aborted":
+        if not pipeline.stopped:
+            print_lg("Browser session was lost, stopping. Resume the run to continue.")
+        pipeline.stop()
+    elif card["outcome"] == "limit" or limit_reached():
+        if not pipeline.stopped:
+            print_lg(f"Reached message limit, stopping.")
+        pipeline.stop()
+    return card
+# >
+
+
+def find_connections(driver: WebDriver, start_index=None, end_index=None, message_limit=None, checkpoint: dict | None = None):
+    pool = open_worker_pool(driver)
+    if pool:
+        with pool:
+            return _find_connections(driver, start_index, end_index, message_limit, pool, checkpoint)
+    return _find_connections(driver, start_index, end_index, message_limit, checkpoint=checkpoint)
+
+
+def resume_connections(driver: WebDriver, checkpoint: dict):
+    '''
+    Continues an unfinished run from its checkpoint: from the first card that wasn't fully processed,
+    with the same end index and whatever is left of its message limit
+    '''
+    global message_count
+    messaged = checkpoint["outcomes"].get("messaged", 0)
+    limit = checkpoint["message_limit"]
+    message_count = None if limit is None else max(limit - messaged, 0)
+    print_lg(
+        f"Resuming messaging from connection {checkpoint['cursor']} ({messaged} already messaged, last profile {checkpoint['last_profile_id']})")
+    find_connections(driver, checkpoint["cursor"],
+                     checkpoint["end_index"], message_count, checkpoint)
+
+
+def harvest_connection_cards(driver: WebDriver, start_index: int | None = None, end_index: int | None = None) -> Iterator[list[dict]]:
+    '''
+    Yields the connection cards in `[start_index, end_index)` in batches, as they get loaded by `scroll_to_bottom`.
+    * Keeps a cursor (index and profile id of the last yielded card), so every batch only reads the cards appended after it
+    * Cards before `start_index` are only counted, never read
+    * If the list was re-rendered and the cursor card moved, harvesting restarts from `start_index` (`seen_store` skips done profiles)
+    * Stops when a load adds no new cards, at `end_index`, or after 3 failed loads. Raises if the browser session is gone
+    '''
+    start = start_index or 0
+    cursor, last_id, misses = 0, None, 0
+    while misses < 3:
+        try:
+            if cursor < start:
+                loaded = fast_forward_connections(driver, start)
+                if loaded <= start:
+                    print_lg(f"Only found {loaded} connections, nothing after index {start}")
+                    return
+                cursor, last_id = start, None
+
+            cards = extract_connection_cards(
+                driver, cursor - 1 if last_id else cursor)
+            if last_id:
+                if not cards or not cards[0]["profile_link"] or canonical_profile_id(cards[0]["profile_link"]) != last_id:
+                    print_lg("Connections list was re-rendered, restarting harvest")
+                    cursor, last_id = 0, None
+                    misses += 1
+                    continue
+                cards = cards[1:]
+            if end_index is not None:
+                cards = [card for card in cards if card["index"] < end_index]
+
+            if not cards:
+                if cursor > 0:
+                    break  # Exit if no new cards are found
+                misses += 1
+            else:
+                misses = 0
+                cursor = cards[-1]["index"] + 1
+                last_link = cards[-1]["profile_link"]
+                last_id = canonical_profile_id(last_link) if last_link else None
+                print_lg(f"Total connections found so far: {cursor}")
+                yield cards
+                if end_index is not None and cursor >= end_index:
+                    return
+
+            # Scroll to the bottom to load more connections
             scroll_to_bottom(driver)
 
         except Exception as e:
+            if classify(e) == "dead_session":
+                raise
             print_lg(f"Error finding connections: {e}")
-            retry += 1
+            misses += 1
+
+
+def _find_connections(driver: WebDriver, start_index=None, end_index=None, message_limit=None, pool: BrowserPool | None = None, checkpoint: dict | None = None):
+    '''
+    Messages connections with a pipeline of stages connected by bounded queues:
+    harvest cards -> filter (seen store, skip words) -> validate profile -> send message -> record result.
+    * Validation and messaging run on one thread per browser of `pool`, or on `driver` if there is no pool
+    * Progress is saved with `save_checkpoint` after every card, pass the loaded `checkpoint` to continue its totals
+    '''
+    global run_state, counts
+    with metrics.run("messaging"):
+        counts = 0
+        run_state = checkpoint or new_checkpoint(start_index, end_index, message_limit)
+        run_state["in_flight"] = {}
+        save_checkpoint(run_state)
+        search_url = f"{linkedin_url}/mynetwork/invite-connect/connections/"
+        # The connections list must be in the home tab, validation switches back there after every profile
+        get_tab_manager(driver).go_home()
+        load_page(driver, search_url)
+
+        wait_for_any(driver, [CONNECTION_CARD_XPATH], 10)
+        wait_for_dom_stable(driver)
+        workers = pool.drivers if pool and pool.drivers else [driver]
+        pipeline = Pipeline()
+        pipeline.source(
+            "harvest", lambda: harvest_stage(driver, start_index, end_index))
+        pipeline.stage("filter", filter_stage)
+        pipeline.stage("validate", validate_stage, [(worker, pipeline, message_limit) for worker in workers])
+        pipeline.stage("message", message_stage, [message_limit] * len(workers))
+        pipeline.stage("record", record_stage, [pipeline])
+        pipeline.run()
+
+        get_seen_store().commit()
+        run_state["finished"] = not pipeline.stopped or limit_reached()
+        save_checkpoint(run_state)
     print_lg(
         f"Finished messaging connections.")
-    pyautogui.alert(
+    show_alert(
         text="Finished messaging connections.", title="Task Completed", button="OK")
 
 
 def set_range(driver):
     global message_start_index, message_end_index, message_count
 
-    choice = pyautogui.confirm(
-        "Do you want to send messages to alter prefined range?", buttons=["From Start",  "Specific Range", "No"])
+    checkpoint = load_checkpoint()
+    buttons = ["From Start",  "Specific Range", "No"]
+    if checkpoint:
+        buttons.insert(0, "Resume")
+    choice = show_confirm(
+        "Do you want to send messages to alter prefined range?", buttons=buttons)
+    if choice == "Resume":
+        return resume_connections(driver, checkpoint)
     if choice == "From Start":
         message_start_index = 0
     if choice == "Specific Range":
-        message_start_index = pyautogui.prompt(
+        message_start_index = show_prompt(
             "Enter the start index (Leave blank for predefined):", "Start Index")
-        message_end_index = pyautogui.prompt(
+        message_end_index = show_prompt(
             "Enter the end index (Leave blank for predefined):", "End Index")
         if message_start_index and message_start_index.isdigit():
             message_start_index = int(message_start_index)
         if message_end_index and message_end_index.isdigit():
             message_end_index = int(message_end_index)
-    count = pyautogui.prompt(
+    count = show_prompt(
         "Enter the number of connections to message (Leave blank for predefined):")
     if count and count.isdigit():
         count = int(count)
@@ -0,0 +1,64 @@
+import os
+import json
+
+from time import time
+
+from modules.helpers import print_lg, write_atomic
+from config.settings import logs_folder_path
+
+
+def get_checkpoint_path() -> str:
+    return os.path.join(logs_folder_path, "checkpoint.json")
+
+
+def new_checkpoint(start_index: int | None, end_index: int | None, message_limit: int | None) -> dict:
+    '''
+    Returns the initial state of a messaging run
+    * `cursor`: index of the first card that is not fully processed, a resumed run starts here
+    * `harvested`: index after the last card read from the list
+    * `outcomes`: number of cards per outcome ("messaged", "skipped", "error", ...)
+    * `in_flight`: `{index: profile_link}` of cards being validated or messaged
+    '''
+    return {
+        "start_index": start_index,
+        "end_index": end_index,
+        "message_limit": message_limit,
+        "cursor": start_index or 0,
+        "harvested": start_index or 0,
+        "outcomes": {},
+        "last_profile_id": None,
+        "in_flight": {},
+        "started_at": time(),
+        "updated_at": time(),
+        "finished": False,
+    }
+
+
+def save_checkpoint(state: dict) -> None:
+    '''
+    Writes `state` atomically, so a crash mid-write never leaves a broken checkpoint
+    '''
+    path = get_checkpoint_path()
+    try:
+        state["updated_at"] = time()
+        write_atomic(path, json.dumps(state))
+    except Exception as e:
+        print_lg(f"Couldn't save checkpoint to {path}: {e}")
+
+
+def load_checkpoint() -> dict | None:
+    '''
+    Returns the state of the last messaging run if it didn't finish, else `None`
+    '''
+    path = get_checkpoint_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding="utf-8") as file:
+            state = json.load(file)
+    except Exception as e:
+        print_lg(f"Couldn't read checkpoint {path}: {e}")
+        return None
+    # JSON turns the int keys of in_flight into strings
+    state["in_flight"] = {int(index): link for index, link in state.get("in_flight", {}).items()}
+    return None if state.get("finished") else state
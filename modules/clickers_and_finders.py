@@ -1,5 +1,7 @@
 
 from modules.helpers import print_lg, sleep
+from modules.retry import ThrottledError, is_throttled
+from config.settings import page_load_strategy
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -7,6 +9,8 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import TimeoutException
+from urllib.parse import urlsplit, parse_qsl
 
 
 # Find functions
@@ -61,8 +65,147 @@ def text_input(actions: ActionChains, textInputEle: WebElement | bool, value: st
 
 def scroll_page(driver: WebDriver):
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    sleep(2)
+    wait_for_dom_stable(driver)
+
 
 def scroll_to_top(driver: WebDriver):
     driver.execute_script("window.scrollTo(0, 0);")
-    sleep(2)
\ No newline at end of file
+    wait_for_dom_stable(driver)
+
+
+# Wait functions
+def wait_for_page_ready(driver: WebDriver, time: float = 10.0) -> bool:
+    '''
+    Waits for a max of `time` seconds until the document is parsed (`readyState` is not "loading"). Needed after `driver.get` with the "none" page load strategy.
+    '''
+    try:
+        WebDriverWait(driver, time, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState;") != "loading")
+        return True
+    except TimeoutException:
+        return False
+
+
+def url_matches(current: str, url: str) -> bool:
+    '''
+    Returns `True` if `current` is the page `url`: same host and path (ignoring a trailing "/") and every query parameter of `url`.
+    Extra query parameters and the fragment of `current` are ignored.
+    '''
+    current, url = urlsplit(current or ""), urlsplit(url)
+    if (current.netloc, current.path.rstrip("/")) != (url.netloc, url.path.rstrip("/")):
+        return False
+    return set(parse_qsl(url.query)) <= set(parse_qsl(current.query))
+
+
+def wait_for_url(driver: WebDriver, url: str, time: float = 5.0) -> bool:
+    '''
+    Waits for a max of `time` seconds until the current tab is on `url` (see `url_matches`) and its document is parsed.
+    * Unlike `wait_for_page_ready` alone, this tells a tab that is still showing its previous page apart from one that loaded `url`
+    * Returns `True` if the tab got there, else `False`
+    '''
+    try:
+        WebDriverWait(driver, time, poll_frequency=0.1).until(
+            lambda d: url_matches(d.current_url, url) and d.execute_script("return document.readyState;") != "loading")
+        return True
+    except TimeoutException:
+        return False
+
+
+def load_page(driver: WebDriver, url: str, time: float = 10.0) -> None:
+    '''
+    Loads `url` with `driver.get`. With the "none" page load strategy `get` returns before the tab left its previous page,
+    so this also waits until it's on `url` (see `wait_for_url`) and raises `TimeoutException` if it doesn't get there.
+    * Raises `ThrottledError` if LinkedIn redirected to one of its throttling or challenge pages instead
+    '''
+    driver.get(url)
+    arrived = page_load_strategy != "none" or wait_for_url(driver, url, time)
+    if is_throttled(driver):
+        raise ThrottledError(f"LinkedIn answered {url} with {driver.current_url}")
+    if not arrived:
+        raise TimeoutException(f"Tab didn't load {url}, still on {driver.current_url}")
+
+
+def wait_for_clickable(driver: WebDriver, target: str | WebElement, time: float = 5.0) -> WebElement | Exception:
+    '''
+    Waits for a max of `time` seconds for `target` to be visible and enabled.
+    * `target` can be an XPath string or an already located `WebElement`
+    * Returns the `WebElement`, else throws `TimeoutException`
+    '''
+    locator = (By.XPATH, target) if isinstance(target, str) else target
+    return WebDriverWait(driver, time, poll_frequency=0.1).until(EC.element_to_be_clickable(locator))
+
+
+def wait_for_any(driver: WebDriver, xpaths: list[str], time: float = 5.0) -> tuple[str, list[WebElement]] | tuple[None, list]:
+    '''
+    Waits for a max of `time` seconds until any of the `xpaths` matches.
+    * Returns `(xpath, elements)` for the first XPath that matched, else `(None, [])`
+    '''
+    def _match(driver):
+        for xpath in xpaths:
+            elements = driver.find_elements(By.XPATH, xpath)
+            if elements:
+                return xpath, elements
+        return False
+    try:
+        return WebDriverWait(driver, time, poll_frequency=0.2).until(_match)
+    except TimeoutException:
+        return None, []
+
+
+def wait_for_dialog_closed(driver: WebDriver, time: float = 5.0) -> bool:
+    '''
+    Waits for a max of `time` seconds for every modal (`[role="dialog"]`) to be hidden or removed. Returns `True` if closed, else `False`.
+    '''
+    try:
+        WebDriverWait(driver, time, poll_frequency=0.1).until(
+            EC.invisibility_of_element_located((By.CSS_SELECTOR, '[role="dialog"]')))
+        return True
+    except TimeoutException:
+        return False
+
+
+# Installs a MutationObserver once per document and returns the milliseconds elapsed since nodes were last added or removed.
+# Attribute and text changes are ignored, LinkedIn updates those constantly (presence dots, counters, overlays).
+DOM_QUIET_TIME_JS = """
+if (!window.__lnObserver) {
+  window.__lnLastMutation = performance.now();
+  window.__lnObserver = new MutationObserver(() => { window.__lnLastMutation = performance.now(); });
+  window.__lnObserver.observe(document.documentElement, {childList: true, subtree: true});
+}
+return performance.now() - window.__lnLastMutation;
+"""
+
+
+def wait_for_dom_stable(driver: WebDriver, quiet: float = 0.5, time: float = 2.0) -> bool:
+    '''
+    Waits until no nodes were added or removed for `quiet` seconds, tracked with a MutationObserver.
+    * Gives up after `time` seconds, pages with endless animations should not block the run
+    * Returns `True` if the DOM settled, else `False`
+    '''
+    try:
+        WebDriverWait(driver, time, poll_frequency=0.1).until(
+            lambda d: d.execute_script(DOM_QUIET_TIME_JS) >= quiet * 1000)
+        return True
+    except TimeoutException:
+        return False
+
+
+COUNT_XPATH_JS = "return document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;"
+
+
+def count_elements(driver: WebDriver, xpath: str) -> int:
+    '''
+    Returns the number of elements matching `xpath`, counted in the page so no element references are transferred
+    '''
+    return driver.execute_script(COUNT_XPATH_JS, xpath)
+
+
+def wait_for_more_elements(driver: WebDriver, xpath: str, count: int, time: float = 5.0) -> int:
+    '''
+    Waits for a max of `time` seconds until more than `count` elements match `xpath`. Returns the latest count.
+    '''
+    try:
+        return WebDriverWait(driver, time, poll_frequency=0.2).until(
+            lambda d: (n := count_elements(d, xpath)) > count and n)
+    except TimeoutException:
+        return count_elements(driver, xpath)
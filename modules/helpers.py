@@ -7,10 +7,10 @@ import pathlib
 from time import sleep
 from random import randint
 from datetime import datetime, timedelta
-from pyautogui import alert
 from pprint import pprint
 
-from config.settings import logs_folder_path
+from config.settings import logs_folder_path, log_max_size_mb, log_max_age_hours, log_backup_count, compress_old_logs
+from modules.logger import LogWriter
 
 
 #### Common functions ####
@@ -39,6 +39,18 @@ def make_directories(paths: list[str]) -> None:
             print(f'Error while creating directory "{path}": ', e)
 
 
+def write_atomic(path: str, content: str, mode: int = 0o666) -> None:
+    '''
+    Writes `content` to `path` through a temporary file that then replaces it, so a crash mid-write never leaves a broken file.
+    * Creates missing directories. `mode` is the permission of a newly created file, eg. `0o600` for secrets
+    '''
+    make_directories([path])
+    temp_path = path + ".tmp"
+    with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode), 'w', encoding="utf-8") as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
 def get_default_temp_profile() -> str:
     # Thanks to https://github.com/vinodbavage31 for suggestion!
     home = pathlib.Path.home()
@@ -114,24 +126,27 @@ def get_log_path():
 
 
 __logs_file_path = get_log_path()
+__log_writer = LogWriter(
+    __logs_file_path,
+    max_bytes=log_max_size_mb * 1024 * 1024,
+    max_age=log_max_age_hours * 3600,
+    backup_count=log_backup_count,
+    compress=compress_old_logs,
+)
 
 
 def print_lg(*msgs: str | dict, end: str = "\n", pretty: bool = False, flush: bool = False, from_critical: bool = False) -> None:
     '''
     Function to log and print. **Note that, `end` and `flush` parameters are ignored if `pretty = True`**
+    * Writing to log.txt is queued and done by a background thread, so this never waits on disk
     '''
-    try:
-        for message in msgs:
+    for message in msgs:
+        try:
             pprint(message) if pretty else print(message, end=end, flush=flush)
-            with open(__logs_file_path, 'a+', encoding="utf-8") as file:
-                file.write(str(message) + end)
-    except Exception as e:
-        trail = f'Skipped saving this message: "{message}" to log.txt!' if from_critical else "We'll try one more time to log..."
-        alert(
-            f"log.txt in {logs_folder_path} is open or is occupied by another program! Please close it! {trail}", "Failed Logging")
-        if not from_critical:
-            critical_error_log(
-                "Log.txt is open or is occupied by another program!", e)
+        except Exception as e:
+            if not from_critical:
+                critical_error_log("Failed printing log message!", e)
+        __log_writer.write(str(message) + end)
 # >
 
 
@@ -154,14 +169,67 @@ def buffer(speed: int = 0) -> None:
         return sleep(randint(18, round(speed)*10)*0.1)
 
 
+# < Dialog related
+__unattended = False
+
+
+def set_unattended(value: bool = True) -> None:
+    '''
+    Turns unattended mode on or off. In unattended mode dialogs are only logged and return their default answer,
+    so runs work on servers without a display
+    '''
+    global __unattended
+    __unattended = value
+
+
+def is_unattended() -> bool:
+    return __unattended
+
+
+def show_alert(text: str, title: str = "", button: str = "OK") -> str:
+    '''
+    Shows a `pyautogui.alert`, or logs `text` and returns `button` in unattended mode
+    '''
+    if __unattended:
+        print_lg(f"[{title}] {text}" if title else text)
+        return button
+    from pyautogui import alert
+    return alert(text, title, button)
+
+
+def show_confirm(text: str, title: str = "", buttons: list[str] = ["OK", "Cancel"], default: str | None = None) -> str | None:
+    '''
+    Shows a `pyautogui.confirm`, or logs `text` and returns `default` in unattended mode
+    '''
+    if __unattended:
+        print_lg(f"{text} -> {default}")
+        return default
+    from pyautogui import confirm
+    return confirm(text, title, buttons)
+
+
+def show_prompt(text: str, title: str = "", default: str | None = None) -> str | None:
+    '''
+    Shows a `pyautogui.prompt`, or logs `text` and returns `default` in unattended mode
+    '''
+    if __unattended:
+        print_lg(f"{text} -> {default}")
+        return default
+    from pyautogui import prompt
+    return prompt(text, title)
+# >
+
+
 def manual_login_retry(is_logged_in: callable, limit: int = 2) -> None:
     '''
     Function to ask and validate manual login
     '''
     count = 0
     while not is_logged_in():
-        from pyautogui import alert
         print_lg("Seems like you're not logged in!")
+        if __unattended:
+            print_lg("Can't wait for a manual login in unattended mode!")
+            return
         button = "Confirm Login"
         message = 'After you successfully Log In, please click "{}" button below.'.format(
             button)
@@ -170,7 +238,7 @@ def manual_login_retry(is_logged_in: callable, limit: int = 2) -> None:
             message = 'If you\'re seeing this message even after you logged in, Click "{}". Seems like auto login confirmation failed!'.format(
                 button)
         count += 1
-        if alert(message, "Login Required", button) and count > limit:
+        if show_alert(message, "Login Required", button) and count > limit:
             return
 
 
@@ -275,39 +343,3 @@ def truncate_for_csv(data, max_length: int = 131000, suffix: str = "...[TRUNCATE
         return truncated
     except Exception as e:
         return f"[ERROR CONVERTING DATA: {e}]"
-
-# csv to save profile urls already messagedimport os
-
-
-def save_seen_profiles(profile: str) -> None:
-    """
-    Appends new profile URLs to seen_profiles.csv without deleting existing data.
-    Prevents duplicates across runs.
-    """
-    file_path = os.path.join(logs_folder_path, "seen_profiles.csv")
-
-    try:
-
-        # Append only new ones
-        with open(file_path, 'a', encoding='utf-8') as file:
-            file.write(f"{profile}\n")
-
-    except Exception as e:
-        print_lg(f"Error saving seen profiles to {file_path}: {e}")
-
-
-def get_profiles_from_csv() -> set:
-    """
-    Reads seen_profiles.csv and returns a set of profile URLs.
-    """
-    file_path = os.path.join(logs_folder_path, "seen_profiles.csv")
-    profiles = set()
-
-    try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as file:
-                profiles = {line.strip() for line in file if line.strip()}
-    except Exception as e:
-        print_lg(f"Error reading seen profiles from {file_path}: {e}")
-
-    return profiles
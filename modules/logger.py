@@ -0,0 +1,136 @@
+import os
+import sys
+import gzip
+import glob
+import queue
+import shutil
+import atexit
+import threading
+
+from time import time
+from datetime import datetime
+
+
+class LogWriter:
+    '''
+    Writes log records to `path` from a background thread so callers never wait on disk.
+    * Records are queued by `write()` and flushed in batches every `flush_interval` seconds
+    * The file is rotated once it is bigger than `max_bytes` or older than `max_age` seconds (`0` disables either check).
+      Its age counts from when it was started, saved in `<path>.started` so it survives restarts
+    * Rotated files are renamed to `<name>-<timestamp><ext>`, gzipped if `compress` is `True`, and only the newest `backup_count` are kept
+    * The thread is started and the file opened on the first `write()`, so creating a writer costs nothing
+    '''
+
+    def __init__(self, path: str, max_bytes: int = 0, max_age: float = 0, backup_count: int = 10, compress: bool = False,
+                 flush_interval: float = 1.0, batch_size: int = 1000) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._opened_at = 0.0
+        self._closed = False
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        '''
+        Queues `text` to be written, never blocks
+        '''
+        if self._closed:
+            return
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        self._queue.put(text)
+
+    def close(self) -> None:
+        '''
+        Flushes every queued record and stops the background thread
+        '''
+        if self._closed or self._thread is None:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            if batch:
+                self._write_batch("".join(batch))
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, text: str) -> None:
+        try:
+            if self._file is None:
+                self._open()
+            self._file.write(text)
+            self._file.flush()
+            if self._should_rotate():
+                self._rotate()
+        except Exception as e:
+            print(f"Failed saving {len(text)} characters to {self.path}: {e}", file=sys.stderr)
+            if self._file:
+                self._file.close()
+            self._file = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, 'a', encoding="utf-8")
+        self._opened_at = self._read_started() if self._file.tell() else None
+        if self._opened_at is None:
+            self._opened_at = time()
+            with open(self.path + ".started", 'w', encoding="utf-8") as file:
+                file.write(str(self._opened_at))
+
+    def _read_started(self) -> float | None:
+        '''
+        Returns when the current file was started, `None` if that wasn't saved
+        '''
+        try:
+            with open(self.path + ".started", 'r', encoding="utf-8") as file:
+                return float(file.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes > 0 and self._file.tell() >= self.max_bytes:
+            return True
+        return self.max_age > 0 and time() - self._opened_at >= self.max_age
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        base, ext = os.path.splitext(self.path)
+        rotated = f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, 'rb') as source, gzip.open(rotated + ".gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+        old_files = sorted(glob.glob(f"{glob.escape(base)}-*{ext}*"))
+        for old_file in old_files[:max(len(old_files) - self.backup_count, 0)]:
+            os.remove(old_file)
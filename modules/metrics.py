@@ -0,0 +1,190 @@
+import os
+import json
+import atexit
+import threading
+
+from time import time, perf_counter
+from functools import wraps
+from contextlib import contextmanager
+from datetime import datetime
+
+from modules.helpers import print_lg, write_atomic
+from config.settings import logs_folder_path, export_metrics, prometheus_textfile_path
+
+
+def percentile(values: list[float], p: float) -> float:
+    '''
+    Returns the `p`th percentile (0-100) of `values` with linear interpolation, 0 if empty
+    '''
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class Metrics:
+    '''
+    Latencies and outcome counts of the stages of a run.
+    * `run` marks one search or messaging run: it starts from empty metrics and exports them when the run ends
+    * `observe` records how long one call of a stage took and how it ended
+    * `count` records an outcome without a duration, e.g. a profile dropped by a filter
+    * Outcomes of the "profile" stage are the processed profiles, used for profiles per minute
+    * Safe to share between threads
+    '''
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.name = None
+        self.started = time()
+        self.finished = None
+        self.latencies: dict[str, list[float]] = {}
+        self.outcomes: dict[str, dict[str, dict[str, int]]] = {}
+
+    @contextmanager
+    def run(self, name: str):
+        '''
+        Context manager (or decorator) around one run called `name`. Metrics recorded before it are dropped and the run's are exported at its end.
+        * A run started inside another one, eg. a search asking for more pages, is part of the outer run
+        '''
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                self.name, self.started, self.finished = name, time(), None
+                self.latencies, self.outcomes = {}, {}
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                ended = not self._depth
+                if ended:
+                    self.finished = time()
+            if ended:
+                self.export()
+
+    def export_unfinished(self) -> None:
+        '''
+        Exports a run that is still going, eg. when the program exits in the middle of it
+        '''
+        if self._depth:
+            self.export()
+
+    def count(self, stage: str, outcome: str, reason: str | None = None) -> None:
+        with self._lock:
+            reasons = self.outcomes.setdefault(stage, {}).setdefault(outcome, {})
+            reasons[reason or ""] = reasons.get(reason or "", 0) + 1
+
+    def observe(self, stage: str, seconds: float, outcome: str = "success", reason: str | None = None) -> None:
+        with self._lock:
+            self.latencies.setdefault(stage, []).append(seconds)
+        self.count(stage, outcome, reason)
+
+    def summary(self) -> dict:
+        with self._lock:
+            duration = (self.finished or time()) - self.started
+            profiles = sum(sum(reasons.values()) for reasons in self.outcomes.get("profile", {}).values())
+            return {
+                "run": self.name,
+                "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "duration_seconds": round(duration, 3),
+                "profiles": profiles,
+                "profiles_per_minute": round(profiles / duration * 60, 3) if duration > 0 else 0.0,
+                "stages": {
+                    stage: {
+                        "count": len(values),
+                        "total": round(sum(values), 6),
+                        "p50": round(percentile(values, 50), 6),
+                        "p95": round(percentile(values, 95), 6),
+                        "p99": round(percentile(values, 99), 6),
+                        "max": round(max(values), 6),
+                    } for stage, values in self.latencies.items()
+                },
+                "outcomes": json.loads(json.dumps(self.outcomes)),
+            }
+
+    def to_prometheus(self, summary: dict | None = None) -> str:
+        '''
+        Returns the summary in the Prometheus text format, for node exporter's textfile collector
+        '''
+        summary = summary or self.summary()
+        lines = [
+            "# HELP linkedin_bot_stage_latency_seconds Latency of each stage of the last run.",
+            "# TYPE linkedin_bot_stage_latency_seconds summary",
+        ]
+        for stage, stats in summary["stages"].items():
+            for quantile, key in [("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")]:
+                lines.append(
+                    f'linkedin_bot_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key]}')
+            lines.append(f'linkedin_bot_stage_latency_seconds_sum{{stage="{stage}"}} {stats["total"]}')
+            lines.append(f'linkedin_bot_stage_latency_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [
+            "# HELP linkedin_bot_outcomes_total Outcomes of each stage of the last run, by reason.",
+            "# TYPE linkedin_bot_outcomes_total counter",
+        ]
+        for stage, outcomes in summary["outcomes"].items():
+            for outcome, reasons in outcomes.items():
+                for reason, count in reasons.items():
+                    reason = reason.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(
+                        f'linkedin_bot_outcomes_total{{stage="{stage}",outcome="{outcome}",reason="{reason}"}} {count}')
+        lines += [
+            "# HELP linkedin_bot_profiles_per_minute Profiles processed per minute in the last run.",
+            "# TYPE linkedin_bot_profiles_per_minute gauge",
+            f"linkedin_bot_profiles_per_minute {summary['profiles_per_minute']}",
+            "# HELP linkedin_bot_run_duration_seconds Duration of the last run.",
+            "# TYPE linkedin_bot_run_duration_seconds gauge",
+            f"linkedin_bot_run_duration_seconds {summary['duration_seconds']}",
+            "# HELP linkedin_bot_run_info Which run these metrics are from.",
+            "# TYPE linkedin_bot_run_info gauge",
+            f'linkedin_bot_run_info{{run="{summary["run"] or ""}"}} 1',
+            "# HELP linkedin_bot_last_export_timestamp_seconds When these metrics were written.",
+            "# TYPE linkedin_bot_last_export_timestamp_seconds gauge",
+            f"linkedin_bot_last_export_timestamp_seconds {time():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path: str | None = None, prometheus_path: str | None = None) -> None:
+        '''
+        Writes the JSON run summary and the Prometheus textfile, each atomically so readers never see half a file
+        * Does nothing if `export_metrics` is False or nothing was recorded
+        '''
+        if not export_metrics or not self.outcomes:
+            return
+        json_path = json_path or os.path.join(logs_folder_path, "run_summary.json")
+        prometheus_path = prometheus_path or prometheus_textfile_path or os.path.join(
+            logs_folder_path, "linkedin_bot.prom")
+        summary = self.summary()
+        for path, content in [(json_path, json.dumps(summary, indent=2)), (prometheus_path, self.to_prometheus(summary))]:
+            try:
+                write_atomic(path, content)
+            except Exception as e:
+                print_lg(f"Couldn't write metrics to {path}: {e}")
+        print_lg(f"{summary['run'] or 'Run'}: processed {summary['profiles']} profiles at {summary['profiles_per_minute']} profiles/min, run summary saved to {json_path}")
+
+
+metrics = Metrics()
+atexit.register(metrics.export_unfinished)
+
+
+def timed(stage: str):
+    '''
+    Decorator that records the latency of every call as `stage` in `metrics`.
+    * Calls that raise are recorded as "failure" with the exception's class as reason, the rest as "success"
+    '''
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                metrics.observe(stage, perf_counter() - start, "failure", type(e).__name__)
+                raise
+            metrics.observe(stage, perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
@@ -4,6 +4,7 @@ from modules.helpers import (
     find_default_profile_directory,
     critical_error_log,
     print_lg,
+    show_alert,
 )
 from config.settings import (
     run_in_background,
@@ -11,28 +12,33 @@ from config.settings import (
     disable_extensions,
     safe_mode,
     logs_folder_path,
+    persist_browser_cache,
+    page_load_strategy,
+    block_heavy_resources,
+    blocked_url_patterns,
 )
+from modules.session_store import restore_session
 
+import os
 import shutil
 import sys
 import subprocess
 import re
+import threading
+
+from contextlib import contextmanager
+from functools import lru_cache
 
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import SessionNotCreatedException
 
-if stealth_mode:
-    import undetected_chromedriver as uc
-else:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-
 
 # ---------------------------
 # Chrome version detection
 # ---------------------------
+@lru_cache(maxsize=1)
 def get_chrome_major_version():
     try:
         output = subprocess.check_output(
@@ -50,12 +56,41 @@ def get_chrome_major_version():
     return None
 
 
+# ---------------------------
+# Resource blocking
+# ---------------------------
+def apply_resource_blocking(driver: WebDriver) -> None:
+    '''
+    Blocks requests matching `blocked_url_patterns` in the current tab with CDP `Network.setBlockedURLs`.
+    * CDP settings are per tab, so this must also be called for every new tab (`TabManager` does it)
+    '''
+    if not block_heavy_resources or not blocked_url_patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns})
+    except Exception as e:
+        print_lg(f"Couldn't enable resource blocking: {e}")
+
+
 # ---------------------------
 # Chrome session creator
 # ---------------------------
-def createChromeSession(isRetry: bool = False):
+def createChromeSession(isRetry: bool = False, user_data_dir: str | None = None):
+    '''
+    Creates a new Chrome session and returns `(options, driver, actions, wait)`.
+    * `user_data_dir` overrides the profile directory, every concurrent session needs its own
+    '''
     make_directories([logs_folder_path])
-    
+
+    # Imported here so that importing this module never loads the driver packages
+    if stealth_mode:
+        import undetected_chromedriver as uc
+    else:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
     options = uc.ChromeOptions() if stealth_mode else Options()
 
     # ❌ Never headless in stealth mode
@@ -71,6 +106,11 @@ def createChromeSession(isRetry: bool = False):
     options.add_argument("--disable-gpu")
     options.add_argument("--remote-debugging-port=0")
 
+    # Only the DOM is needed for selectors, explicit waits take care of readiness
+    options.page_load_strategy = page_load_strategy
+    if block_heavy_resources:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+
     print_lg(
         "IF YOU HAVE MORE THAN 5 TABS OPENED, PLEASE CLOSE OR BOOKMARK THEM!"
     )
@@ -80,7 +120,10 @@ def createChromeSession(isRetry: bool = False):
     # ---------------------------
     # PROFILE LOGIC (CRITICAL FIX)
     # ---------------------------
-    if stealth_mode:
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    elif stealth_mode:
         # UC must ALWAYS use temp profile
         options.add_argument(f"--user-data-dir={get_default_temp_profile()}")
 
@@ -94,6 +137,12 @@ def createChromeSession(isRetry: bool = False):
     else:
         options.add_argument(f"--user-data-dir={get_default_temp_profile()}")
 
+    # Worker sessions keep their cache in their own user_data_dir
+    if persist_browser_cache and not user_data_dir:
+        cache_dir = os.path.abspath(os.path.join(logs_folder_path, "browser_cache"))
+        make_directories([cache_dir])
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+
     # ---------------------------
     # DRIVER CREATION
     # ---------------------------
@@ -125,6 +174,7 @@ def createChromeSession(isRetry: bool = False):
         )
 
     driver.maximize_window()
+    apply_resource_blocking(driver)
     wait = WebDriverWait(driver, 5)
     actions = ActionChains(driver)
 
@@ -135,46 +185,87 @@ def createChromeSession(isRetry: bool = False):
 # Bootstrap
 # ---------------------------
 options, driver, actions, wait = None, None, None, None
+__driver_lock = threading.RLock()
+
+
 def restart_driver():
     global options, driver, actions, wait
     options, driver, actions, wait = createChromeSession()
+    restore_session(driver)
     globals()['driver'] = driver
     globals()['wait'] = wait
     globals()['actions'] = actions
     globals()['options'] = options
     return options, driver, actions, wait
 
-try:
-    restart_driver()
-except SessionNotCreatedException as e:
-    critical_error_log(
-        "Failed to create Chrome Session, retrying with guest profile", e
-    )
-    options, driver, actions, wait = createChromeSession(True)
-
-except Exception as e:
-    msg = (
-        "Seems like Google Chrome is out dated. Update browser and try again!\n\n"
-        "If issue persists, try Safe Mode. Set safe_mode = True in config.py\n\n"
-        "Check GitHub discussions/support:\n"
-        "https://github.com/GodsScion/Auto_job_applier_linkedIn\n\n"
-        "OR reach out on Discord:\n"
-        "https://discord.gg/fFp7uUzWCY"
-    )
+def start_driver() -> WebDriver:
+    '''
+    Launches the shared Chrome session. Falls back to a guest profile if the session can't be created, and exits on other errors.
+    '''
+    global options, driver, actions, wait
+    with __driver_lock:
+        if driver is not None:
+            return driver
+        try:
+            restart_driver()
+        except SessionNotCreatedException as e:
+            critical_error_log(
+                "Failed to create Chrome Session, retrying with guest profile", e
+            )
+            options, driver, actions, wait = createChromeSession(True)
+            restore_session(driver)
+
+        except Exception as e:
+            msg = (
+                "Seems like Google Chrome is out dated. Update browser and try again!\n\n"
+                "If issue persists, try Safe Mode. Set safe_mode = True in config.py\n\n"
+                "Check GitHub discussions/support:\n"
+                "https://github.com/GodsScion/Auto_job_applier_linkedIn\n\n"
+                "OR reach out on Discord:\n"
+                "https://discord.gg/fFp7uUzWCY"
+            )
+
+            if isinstance(e, TimeoutError):
+                msg = "Couldn't download Chrome-driver. Set stealth_mode = False in config!"
+
+            print_lg(msg)
+            critical_error_log("In Opening Chrome", e)
+
+            try:
+                show_alert(msg, "Error in opening chrome")
+            except Exception:
+                pass
+
+            if driver:
+                driver.quit()
 
-    if isinstance(e, TimeoutError):
-        msg = "Couldn't download Chrome-driver. Set stealth_mode = False in config!"
+            sys.exit(1)
+    return driver
 
-    print_lg(msg)
-    critical_error_log("In Opening Chrome", e)
 
-    try:
-        from pyautogui import alert
-        alert(msg, "Error in opening chrome")
-    except Exception:
-        pass
+def get_driver() -> WebDriver:
+    '''
+    Returns the shared Chrome session, launching it the first time it's needed. Importing this module never starts Chrome.
+    '''
+    return driver if driver is not None else start_driver()
 
-    if driver:
-        driver.quit()
 
-    sys.exit(1)
+def get_wait() -> WebDriverWait:
+    '''
+    Returns the `WebDriverWait` of the shared session, launching it if needed
+    '''
+    get_driver()
+    return wait
+
+
+@contextmanager
+def browser_session(user_data_dir: str | None = None):
+    '''
+    Context manager for a separate Chrome session that is quit on exit. Use `modules.worker_pool.BrowserPool` for several at once.
+    '''
+    _, session, _, _ = createChromeSession(user_data_dir=user_data_dir)
+    try:
+        restore_session(session)
+        yield session
+    finally:
+        session.quit()
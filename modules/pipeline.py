@@ -0,0 +1,149 @@
+import queue
+import threading
+
+from time import perf_counter
+from typing import Iterable
+
+from modules.helpers import print_lg
+
+_STOP = object()
+
+
+class StageStats:
+    '''
+    Counters of one pipeline stage, updated by all of its threads
+    '''
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.passed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, passed: bool, error: bool = False) -> None:
+        with self._lock:
+            self.processed += 1
+            self.busy += seconds
+            if error:
+                self.errors += 1
+            if passed:
+                self.passed += 1
+            else:
+                self.dropped += 1
+
+    def summary(self, wall: float) -> str:
+        per_minute = self.processed * 60 / wall if wall > 0 else 0
+        average = self.busy / self.processed if self.processed else 0
+        return (f"{self.name}: {self.processed} items ({self.passed} passed, {self.dropped} dropped, {self.errors} errors), "
+                f"{per_minute:.1f}/min, {average:.2f}s avg, {self.workers} worker(s)")
+
+
+class Pipeline:
+    '''
+    Runs a source and a chain of stages on their own threads, connected by bounded queues.
+    * `source(name, produce)`: every item of the iterable returned by `produce()` goes to the first stage
+    * `stage(name, work, contexts)`: runs `work(context, item)` on one thread per entry of `contexts` (eg. one per browser)
+    * `work` returns the item for the next stage, or `None` to drop it. Exceptions are logged and drop the item
+    * Queues hold at most `maxsize` items, so a slow stage makes the stages before it wait (backpressure)
+    * `stop()` makes the source stop producing, items already inside the pipeline are still processed
+    * A source that raises stops the pipeline too, so `stopped` is `False` only if the source ran to its end
+    '''
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self.maxsize = maxsize
+        self.stats: list[StageStats] = []
+        self._source = None
+        self._stages = []
+        self._stopped = threading.Event()
+
+    def source(self, name: str, produce: callable) -> "Pipeline":
+        self._source = (StageStats(name, 1), produce)
+        return self
+
+    def stage(self, name: str, work: callable, contexts: Iterable = (None,)) -> "Pipeline":
+        contexts = list(contexts)
+        self._stages.append((StageStats(name, len(contexts)), work, contexts))
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def run(self) -> list[StageStats]:
+        '''
+        Runs the pipeline until the source is exhausted or stopped and every item has left the last stage. Returns the stage stats.
+        '''
+        queues = [queue.Queue(self.maxsize) for _ in self._stages]
+        started = perf_counter()
+        threads = [threading.Thread(target=self._produce, args=(queues[0],), name="pipeline-source", daemon=True)]
+        for index, (stats, work, contexts) in enumerate(self._stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            workers = [threading.Thread(target=self._work, args=(stats, work, context, queues[index], outbox),
+                                        name=f"pipeline-{stats.name}-{number}", daemon=True)
+                       for number, context in enumerate(contexts)]
+            threads.extend(workers)
+            if outbox is not None:
+                threads.append(threading.Thread(target=self._close_after, args=(workers, outbox, len(self._stages[index + 1][2])),
+                                                name=f"pipeline-{stats.name}-closer", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        wall = perf_counter() - started
+        self.stats = [self._source[0]] + [stats for stats, _, _ in self._stages]
+        for stats in self.stats:
+            print_lg(stats.summary(wall))
+        return self.stats
+
+    def _produce(self, outbox: queue.Queue) -> None:
+        stats, produce = self._source
+        items = None
+        try:
+            items = iter(produce())
+            while not self.stopped:
+                start = perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    print_lg(f"Pipeline source {stats.name} failed: {e}")
+                    stats.record(perf_counter() - start, False, True)
+                    self.stop()
+                    break
+                stats.record(perf_counter() - start, True)
+                outbox.put(item)
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+            for _ in self._stages[0][2]:
+                outbox.put(_STOP)
+
+    def _work(self, stats: StageStats, work: callable, context, inbox: queue.Queue, outbox: queue.Queue | None) -> None:
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            start = perf_counter()
+            try:
+                result, error = work(context, item), False
+            except Exception as e:
+                print_lg(f"Pipeline stage {stats.name} failed: {e}")
+                result, error = None, True
+            stats.record(perf_counter() - start, result is not None, error)
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+    def _close_after(self, workers: list[threading.Thread], outbox: queue.Queue, next_workers: int) -> None:
+        for worker in workers:
+            worker.join()
+        for _ in range(next_workers):
+            outbox.put(_STOP)
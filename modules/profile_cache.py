@@ -0,0 +1,93 @@
+import os
+import atexit
+import sqlite3
+import threading
+
+from time import time
+
+from modules.helpers import make_directories
+from modules.seen_store import canonical_profile_id
+from config.settings import logs_folder_path, profile_cache_ttl_hours
+
+
+class ProfileCache:
+    '''
+    Persistent cache of validated profile metadata, keyed by `canonical_profile_id`.
+    * Stores the extracted company, headline, validation decision and extraction time
+    * Entries older than `ttl` seconds, or validated with a different `fingerprint` of skip words, are treated as missing
+    * `ttl <= 0` disables the cache
+    * Safe to share between threads
+    '''
+
+    def __init__(self, path: str, ttl: float, fingerprint: str) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        make_directories([path])
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS profiles (
+            profile_id TEXT PRIMARY KEY,
+            company TEXT,
+            headline TEXT,
+            decision INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            extracted_at REAL NOT NULL
+        ) WITHOUT ROWID""")
+        self._db.commit()
+
+    def get(self, profile_link: str) -> dict | None:
+        '''
+        Returns `{"company", "headline", "decision", "extracted_at"}` of a fresh entry, else `None`
+        '''
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT company, headline, decision, extracted_at FROM profiles WHERE profile_id = ? AND fingerprint = ? AND extracted_at >= ?",
+                (canonical_profile_id(profile_link), self.fingerprint, time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        return {"company": row[0], "headline": row[1], "decision": bool(row[2]), "extracted_at": row[3]}
+
+    def put(self, profile_link: str, company: str | None, headline: str | None, decision: bool) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?)",
+                             (canonical_profile_id(profile_link), company, headline, int(decision), self.fingerprint, time()))
+
+    def prune(self) -> int:
+        '''
+        Deletes expired entries and entries of other skip word lists. Returns the number of deleted entries.
+        '''
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM profiles WHERE fingerprint != ? OR extracted_at < ?",
+                                    (self.fingerprint, time() - self.ttl)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+__profile_cache = None
+__profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache(fingerprint: str) -> ProfileCache:
+    '''
+    Returns the shared `ProfileCache` at `logs_folder_path/profile_cache.db` for the skip words with `fingerprint`
+    '''
+    global __profile_cache
+    with __profile_cache_lock:
+        if __profile_cache is None:
+            __profile_cache = ProfileCache(
+                os.path.join(logs_folder_path, "profile_cache.db"),
+                profile_cache_ttl_hours * 3600,
+                fingerprint,
+            )
+            __profile_cache.prune()
+            atexit.register(__profile_cache.close)
+        return __profile_cache
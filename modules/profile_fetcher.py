@@ -0,0 +1,131 @@
+import weakref
+import threading
+
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from modules.helpers import print_lg
+
+
+class ProfileParser(HTMLParser):
+    '''
+    Single pass parser that pulls the validation fields out of a profile page.
+    * `company`: text after "Current company:" in a button aria-label
+    * `experience_company`: company of the first `/company/` link in the Experience section
+    * `has_experience`: `True` if an Experience section heading was found
+    '''
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.company = None
+        self.experience_company = None
+        self.has_experience = False
+        self._section_depth = 0
+        self._in_heading = False
+        self._in_experience = False
+        self._link_lines = None
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        attrs = dict(attrs)
+        aria = attrs.get("aria-label") or ""
+        if tag == "button" and self.company is None and "Current company:" in aria:
+            self.company = aria.split("Current company:")[1].split(".")[0].strip()
+        elif tag == "section":
+            self._section_depth += 1
+        elif tag in ("h2", "span") and self._section_depth:
+            self._in_heading = True
+        elif tag == "a" and self._in_experience and self.experience_company is None and "/company/" in (attrs.get("href") or ""):
+            self._link_lines = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "section" and self._section_depth:
+            self._section_depth -= 1
+            if not self._section_depth:
+                self._in_experience = False
+        elif tag in ("h2", "span"):
+            self._in_heading = False
+        elif tag == "a" and self._link_lines is not None:
+            # Same layout as the browser path: second line of the link is "<company> · <type>"
+            if len(self._link_lines) > 1:
+                self.experience_company = self._link_lines[1].split("·")[0].strip()
+            self._link_lines = None
+
+    def handle_data(self, data: str) -> None:
+        text = data.strip()
+        if not text:
+            return
+        if self._in_heading and text == "Experience":
+            self.has_experience = self._in_experience = True
+        if self._link_lines is not None:
+            self._link_lines.append(text)
+
+
+class ProfileFetcher:
+    '''
+    Fetches profile pages over HTTP with the cookies of a logged-in browser, instead of opening a tab.
+    * Connections are pooled, so repeated fetches reuse the same TLS connection
+    * Call `sync_cookies()` again if the browser session changes
+    '''
+
+    def __init__(self, driver: WebDriver | None = None, timeout: float = 10.0, pool_size: int = 4) -> None:
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if driver is not None:
+            self.sync_cookies(driver)
+
+    def sync_cookies(self, driver: WebDriver) -> None:
+        self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+        self.session.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+    def fetch(self, profile_link: str) -> dict | None:
+        '''
+        Returns `{"company", "experience_company", "has_experience"}` parsed from `profile_link`.
+        * Returns `None` if the request failed, LinkedIn asked to log in, or nothing could be parsed
+        '''
+        try:
+            response = self.session.get(profile_link, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            print_lg(f"HTTP fetch failed for {profile_link}: {e}")
+            return None
+        if any(marker in response.url for marker in ("/authwall", "/login", "/checkpoint")):
+            print_lg(f"HTTP fetch of {profile_link} was redirected to {response.url}")
+            return None
+
+        parser = ProfileParser()
+        try:
+            parser.feed(response.text)
+            parser.close()
+        except Exception as e:
+            print_lg(f"Couldn't parse profile page {profile_link}: {e}")
+            return None
+        if parser.company is None and not parser.has_experience:
+            return None
+        return {
+            "company": parser.company,
+            "experience_company": parser.experience_company,
+            "has_experience": parser.has_experience,
+        }
+
+
+__fetchers = weakref.WeakKeyDictionary()
+__fetchers_lock = threading.Lock()
+
+
+def get_profile_fetcher(driver: WebDriver) -> ProfileFetcher:
+    '''
+    Returns the `ProfileFetcher` sharing the cookies of `driver`, one per browser session
+    '''
+    with __fetchers_lock:
+        if driver not in __fetchers:
+            __fetchers[driver] = ProfileFetcher(driver)
+        return __fetchers[driver]
@@ -0,0 +1,155 @@
+import os
+import json
+import threading
+
+from time import time, sleep
+from random import uniform
+
+from modules.helpers import print_lg, write_atomic
+from config.settings import logs_folder_path, rate_limits, rate_jitter, rate_max_wait_minutes
+
+
+class TokenBucket:
+    '''
+    Holds up to `capacity` tokens and refills `rate` tokens per second
+    '''
+
+    def __init__(self, capacity: float, rate: float, tokens: float | None = None, updated: float | None = None) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity if tokens is None else min(tokens, capacity)
+        self.updated = time() if updated is None else updated
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        '''
+        Seconds until one token is available, call `refill` first
+        '''
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+def make_buckets(burst: int, per_hour: int, per_day: int) -> dict[str, TokenBucket]:
+    '''
+    Returns the buckets that must all hold a token for one action. A limit of 0 has no bucket.
+    * "hour" refills at `per_hour` tokens an hour and holds at most `burst` of them (`per_hour` if `burst` is 0), so at most `burst` actions run back to back
+    * "day" caps the total over a day
+    '''
+    buckets = {}
+    if per_hour > 0:
+        buckets["hour"] = TokenBucket(burst or per_hour, per_hour / 3600)
+    if per_day > 0:
+        buckets["day"] = TokenBucket(per_day, per_day / 86400)
+    return buckets
+
+
+class RateGovernor:
+    '''
+    Central pacing of actions like "invite" and "message", instead of fixed sleeps.
+    * Each action has token buckets from `limits`, an action runs only when all its buckets hold a token
+    * Bucket levels are saved to `path` after every action, so limits hold across runs
+    * Safe to share between threads, waiting threads don't block each other
+    '''
+
+    def __init__(self, limits: dict[str, dict], path: str, jitter: float = 0, max_wait: float = 3600) -> None:
+        self.path = path
+        self.jitter = jitter
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self.buckets = {action: make_buckets(limit.get("burst", 0), limit.get("per_hour", 0), limit.get("per_day", 0))
+                        for action, limit in limits.items()}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding="utf-8") as file:
+                state = json.load(file)
+        except Exception as e:
+            print_lg(f"Couldn't read rate limit state {self.path}: {e}")
+            return
+        for action, buckets in self.buckets.items():
+            for name, bucket in buckets.items():
+                saved = state.get(action, {}).get(name)
+                if saved:
+                    bucket.tokens = min(saved["tokens"], bucket.capacity)
+                    bucket.updated = saved["updated"]
+
+    def _save(self) -> None:
+        state = {action: {name: {"tokens": bucket.tokens, "updated": bucket.updated} for name, bucket in buckets.items()}
+                 for action, buckets in self.buckets.items()}
+        try:
+            write_atomic(self.path, json.dumps(state))
+        except Exception as e:
+            print_lg(f"Couldn't save rate limit state to {self.path}: {e}")
+
+    def _take(self, action: str) -> float:
+        '''
+        Takes a token of `action` and returns 0, or returns the seconds to wait if a bucket is empty
+        '''
+        with self._lock:
+            buckets = self.buckets.get(action, {}).values()
+            now = time()
+            for bucket in buckets:
+                bucket.refill(now)
+            wait = max((bucket.wait_time() for bucket in buckets), default=0)
+            if wait > 0:
+                return wait
+            for bucket in buckets:
+                bucket.tokens -= 1
+            self._save()
+            return 0
+
+    def acquire(self, action: str) -> bool:
+        '''
+        Waits until `action` is allowed and takes a token, then waits a random `0 to jitter` seconds.
+        * Returns `False` without taking a token if the wait would be longer than `max_wait` seconds, e.g. the daily limit is used up
+        * Actions without limits return `True` right away
+        '''
+        announced = False
+        while (wait := self._take(action)) > 0:
+            if wait > self.max_wait:
+                print_lg(f'Rate limit for "{action}" reached, next one allowed in {wait / 60:.1f} minutes.')
+                return False
+            if not announced:
+                print_lg(f'Waiting {wait:.0f}s for the "{action}" rate limit.')
+                announced = True
+            # Wake up regularly, another thread may have changed the buckets
+            sleep(min(wait, 5))
+        if self.jitter > 0:
+            sleep(uniform(0, self.jitter))
+        return True
+
+    def exhausted(self, action: str) -> bool:
+        '''
+        Returns `True` if `acquire` of `action` would give up right now
+        '''
+        with self._lock:
+            buckets = self.buckets.get(action, {}).values()
+            now = time()
+            for bucket in buckets:
+                bucket.refill(now)
+            return max((bucket.wait_time() for bucket in buckets), default=0) > self.max_wait
+
+
+__rate_governor = None
+__rate_governor_lock = threading.Lock()
+
+
+def get_rate_governor() -> RateGovernor:
+    '''
+    Returns the shared `RateGovernor` configured by `rate_limits`, with its state in `logs_folder_path/rate_limits.json`
+    '''
+    global __rate_governor
+    with __rate_governor_lock:
+        if __rate_governor is None:
+            __rate_governor = RateGovernor(
+                rate_limits,
+                os.path.join(logs_folder_path, "rate_limits.json"),
+                rate_jitter,
+                rate_max_wait_minutes * 60,
+            )
+        return __rate_governor
@@ -0,0 +1,121 @@
+import inspect
+
+from time import sleep
+from random import uniform
+from functools import wraps
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    TimeoutException,
+    NoSuchElementException,
+    InvalidSessionIdException,
+    WebDriverException,
+)
+
+from modules.helpers import print_lg
+from modules.metrics import metrics
+from config.settings import throttle_pause_minutes
+
+
+class ThrottledError(Exception):
+    '''
+    Raised when LinkedIn answers with a challenge or "too many requests" page instead of the requested one, see `load_page`
+    '''
+
+
+# Parts of the address LinkedIn redirects to when it throttles or challenges a session
+THROTTLE_URL_MARKERS = ("/checkpoint/challenge", "/authwall", "/too-many-requests")
+
+# Messages of `WebDriverException` that mean the browser or its session is gone
+DEAD_SESSION_MARKERS = ("invalid session id", "no such session", "chrome not reachable",
+                        "disconnected", "session deleted", "target window already closed")
+
+
+def is_loading(driver: WebDriver) -> bool:
+    '''
+    Returns `True` if the current document of `driver` is still being parsed
+    '''
+    try:
+        return driver.execute_script("return document.readyState;") == "loading"
+    except Exception:
+        return False
+
+
+def is_throttled(driver: WebDriver) -> bool:
+    '''
+    Returns `True` if the current page of `driver` is one of LinkedIn's throttling or challenge pages
+    '''
+    try:
+        url = driver.current_url or ""
+    except Exception:
+        return False
+    return any(marker in url for marker in THROTTLE_URL_MARKERS)
+
+
+def classify(e: BaseException, driver: WebDriver | None = None) -> str:
+    '''
+    Returns how a failed call should be retried:
+    * "stale": the element changed under us, query it again right away
+    * "timeout": the page was slow, retry after a backoff
+    * "dead_session": the browser is gone, nothing on this driver can succeed any more
+    * "throttled": LinkedIn is throttling, pause for `throttle_pause_minutes`
+    * "fatal": retrying won't help
+    A timeout or missing element on a throttling page of `driver` is "throttled". A missing element is only worth a retry
+    ("timeout") while the page is still loading, else it's "fatal".
+    '''
+    if isinstance(e, ThrottledError):
+        return "throttled"
+    if isinstance(e, (StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException)):
+        return "stale"
+    if isinstance(e, (TimeoutException, NoSuchElementException)):
+        if driver is not None and is_throttled(driver):
+            return "throttled"
+        if isinstance(e, TimeoutException) or (driver is not None and is_loading(driver)):
+            return "timeout"
+        return "fatal"
+    if isinstance(e, InvalidSessionIdException):
+        return "dead_session"
+    if isinstance(e, WebDriverException) and any(marker in str(e).lower() for marker in DEAD_SESSION_MARKERS):
+        return "dead_session"
+    if isinstance(e, ConnectionError) or type(e).__name__ in ("MaxRetryError", "NewConnectionError", "ProtocolError"):
+        return "dead_session"
+    return "fatal"
+
+
+def retry(attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+    '''
+    Decorator that retries a WebDriver call up to `attempts` times in total, picking what to do from `classify`.
+    * "stale": retries immediately
+    * "timeout": waits `base_delay * 2^n` seconds (at most `max_delay`) plus jitter, then retries
+    * "throttled": pauses `throttle_pause_minutes`, then retries
+    * "dead_session", "fatal" errors and the last failure are raised to the caller. A dead session is never retried here: the callers
+      hold the driver and its tabs, so the run has to end (resumable from its checkpoint) and a new session be started above it.
+      Only `batch.run_jobs` does that, the interactive runs stop and have to be resumed by hand
+    * Every retry is counted in `metrics` as stage "retry", outcome the kind, reason the function's name
+    '''
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            driver = signature.bind(*args, **kwargs).arguments.get("driver")
+            for attempt in range(1, attempts + 1):
+                try:
+                    return function(*args, **kwargs)
+                except Exception as e:
+                    kind = classify(e, driver)
+                    if kind in ("fatal", "dead_session") or attempt == attempts:
+                        raise
+                    metrics.count("retry", kind, function.__name__)
+                    print_lg(f"{function.__name__} failed ({kind}: {type(e).__name__}), retry {attempt} of {attempts - 1}")
+                    if kind == "timeout":
+                        delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+                        sleep(delay + uniform(0, delay))
+                    elif kind == "throttled":
+                        print_lg(f"LinkedIn is throttling, pausing for {throttle_pause_minutes} minutes")
+                        sleep(throttle_pause_minutes * 60)
+        return wrapper
+    return decorator
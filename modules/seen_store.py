@@ -0,0 +1,142 @@
+import os
+import atexit
+import sqlite3
+import threading
+
+from time import time
+from urllib.parse import urlsplit, unquote
+
+from modules.helpers import print_lg, make_directories
+from config.settings import logs_folder_path
+
+
+def canonical_profile_id(profile_link: str) -> str:
+    '''
+    Returns the stable id of a LinkedIn profile URL, ignoring host, query string, fragment and trailing slashes.
+    * "https://www.linkedin.com/in/John-Doe-123/?miniProfileUrn=x" -> "john-doe-123"
+    * URLs that are not `/in/<id>` links fall back to their lower-cased path
+    '''
+    parts = [part for part in urlsplit(profile_link.strip()).path.split("/") if part]
+    if "in" in parts[:-1]:
+        return unquote(parts[parts.index("in") + 1]).lower()
+    return unquote("/".join(parts)).lower()
+
+
+class SeenStore:
+    '''
+    Indexed store of profiles that were already messaged or skipped, backed by SQLite in WAL mode.
+    * Profiles are keyed by `canonical_profile_id`, so different URLs of one profile are one entry
+    * `add()` batches writes and commits every `batch_size` entries, pass `commit=True` for entries that must survive a crash
+    * Membership checks hit the primary key index, nothing is loaded into memory
+    * Safe to share between threads
+    '''
+
+    def __init__(self, path: str, batch_size: int = 50) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        make_directories([path])
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS seen_profiles (
+            profile_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            seen_at REAL NOT NULL
+        ) WITHOUT ROWID""")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+    def __contains__(self, profile_link: str) -> bool:
+        profile_id = canonical_profile_id(profile_link)
+        with self._lock:
+            if profile_id in self._pending:
+                return True
+            return self._db.execute(
+                "SELECT 1 FROM seen_profiles WHERE profile_id = ?", (profile_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._commit()
+            return self._db.execute("SELECT COUNT(*) FROM seen_profiles").fetchone()[0]
+
+    def get(self, profile_link: str) -> dict | None:
+        '''
+        Returns `{"url", "outcome", "seen_at"}` of a profile, or `None` if it was never seen
+        '''
+        profile_id = canonical_profile_id(profile_link)
+        with self._lock:
+            self._commit()
+            row = self._db.execute(
+                "SELECT url, outcome, seen_at FROM seen_profiles WHERE profile_id = ?", (profile_id,)).fetchone()
+        return dict(zip(("url", "outcome", "seen_at"), row)) if row else None
+
+    def add(self, profile_link: str, outcome: str = "messaged", commit: bool = False) -> None:
+        profile_id = canonical_profile_id(profile_link)
+        with self._lock:
+            self._pending[profile_id] = (profile_id, profile_link, outcome, time())
+            if commit or len(self._pending) >= self.batch_size:
+                self._commit()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def _commit(self) -> None:
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany("""INSERT INTO seen_profiles (profile_id, url, outcome, seen_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(profile_id) DO UPDATE SET url = excluded.url, outcome = excluded.outcome, seen_at = excluded.seen_at""",
+                                 self._pending.values())
+        self._pending.clear()
+
+    def migrate_from_csv(self, csv_path: str) -> int:
+        '''
+        One time import of the old `seen_profiles.csv` (one URL per line). Returns the number of imported lines.
+        * Skipped if the file doesn't exist or was already imported
+        '''
+        with self._lock:
+            if not os.path.exists(csv_path) or self._db.execute(
+                    "SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone():
+                return 0
+            imported_at = time()
+            count = 0
+            with open(csv_path, 'r', encoding='utf-8') as file, self._db:
+                for line in file:
+                    url = line.strip()
+                    if not url:
+                        continue
+                    self._db.execute("INSERT OR IGNORE INTO seen_profiles (profile_id, url, outcome, seen_at) VALUES (?, ?, ?, ?)",
+                                     (canonical_profile_id(url), url, "migrated", imported_at))
+                    count += 1
+                self._db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)", (csv_path,))
+        print_lg(f"Imported {count} profiles from {csv_path} into {self.path}")
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._db.close()
+
+
+__seen_store = None
+__seen_store_lock = threading.Lock()
+
+
+def get_seen_store() -> SeenStore:
+    '''
+    Returns the shared `SeenStore` at `logs_folder_path/seen_profiles.db`, importing `seen_profiles.csv` the first time
+    '''
+    global __seen_store
+    with __seen_store_lock:
+        if __seen_store is None:
+            __seen_store = SeenStore(os.path.join(logs_folder_path, "seen_profiles.db"))
+            __seen_store.migrate_from_csv(
+                os.path.join(logs_folder_path, "seen_profiles.csv"))
+            atexit.register(__seen_store.commit)
+        return __seen_store
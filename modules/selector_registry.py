@@ -0,0 +1,154 @@
+import os
+import json
+import threading
+
+from time import monotonic, sleep
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import NoSuchElementException
+
+from modules.helpers import print_lg, write_atomic
+from config.settings import logs_folder_path
+
+
+class SelectorRegistry:
+    '''
+    Named lookup targets, each with ordered `(By, value)` variants for the different layouts LinkedIn serves.
+    * The variant that matched last is tried first from then on, and that order is saved to `path` for the next runs
+    * A lookup tries every variant with `find_elements`, which never waits, so a variant that doesn't match costs one round trip.
+      All variants of a target share one wait of at most its `budget` seconds, instead of one `WebDriverWait` timeout per variant
+    * A variant that lost to another variant of its target in `retire_after` lookups in a row is retired: it's no longer polled,
+      only tried once more when a lookup runs out of time. It's back in use as soon as it matches again
+    * Safe to share between threads
+    '''
+
+    def __init__(self, path: str, poll: float = 0.1, retire_after: int = 20) -> None:
+        self.path = path
+        self.poll = poll
+        self.retire_after = retire_after
+        self.targets: dict[str, list[tuple[str, str]]] = {}
+        self.budgets: dict[str, float] = {}
+        self.misses: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._saved = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding="utf-8") as file:
+                    self._saved = json.load(file)
+            except Exception as e:
+                print_lg(f"Couldn't read selector order {path}: {e}")
+
+    def register(self, name: str, variants: list[tuple[str, str]], budget: float = 0.0) -> None:
+        '''
+        Adds the target `name`. `variants` are in default order, a saved order from earlier runs wins.
+        '''
+        saved = self._saved.get(name, [])
+        rank = {value: saved.index(value) for value in saved}
+        with self._lock:
+            self.targets[name] = sorted(variants, key=lambda variant: rank.get(variant[1], len(saved)))
+            self.budgets[name] = budget
+
+    def _variants(self, name: str, final: bool) -> list[tuple[str, str]]:
+        '''
+        Returns the variants of `name` to try now, retired ones only if `final`
+        '''
+        with self._lock:
+            return [variant for variant in self.targets[name]
+                    if final or self.misses.get((name, variant[1]), 0) < self.retire_after]
+
+    def _hit(self, name: str, variant: tuple[str, str]) -> None:
+        with self._lock:
+            variants = self.targets[name]
+            self.misses[(name, variant[1])] = 0
+            for _, value in variants:
+                if value != variant[1]:
+                    self.misses[(name, value)] = self.misses.get((name, value), 0) + 1
+                    if self.misses[(name, value)] == self.retire_after:
+                        print_lg(f'Selector "{name}" stops polling {value}, it missed {self.retire_after} times in a row')
+            if variants[0] == variant:
+                return
+            variants.remove(variant)
+            variants.insert(0, variant)
+            self._saved[name] = [value for _, value in variants]
+            saved = dict(self._saved)
+        print_lg(f'Selector "{name}" now tries {variant[1]} first')
+        try:
+            write_atomic(self.path, json.dumps(saved, indent=2))
+        except Exception as e:
+            print_lg(f"Couldn't save selector order to {self.path}: {e}")
+
+    def find_first(self, context: WebDriver | WebElement, names: list[str], time: float | None = None) -> tuple[str | None, list[WebElement]]:
+        '''
+        Returns `(name, elements)` of the first target in `names` with a matching variant inside `context`, polling for at most
+        `time` seconds (the largest budget of `names` if `None`). Returns `(None, [])` if nothing matched.
+        * Targets are tried in the given order, the variants of each target in their learned order
+        '''
+        if time is None:
+            time = max(self.budgets.get(name, 0.0) for name in names)
+        deadline = monotonic() + time
+        while True:
+            final = monotonic() >= deadline
+            for name in names:
+                for variant in self._variants(name, final):
+                    elements = context.find_elements(*variant)
+                    if elements:
+                        self._hit(name, variant)
+                        return name, elements
+            if final:
+                return None, []
+            sleep(self.poll)
+
+    def find_all(self, context: WebDriver | WebElement, name: str, time: float | None = None) -> list[WebElement]:
+        '''
+        Returns the elements of the first variant of `name` that matches inside `context`, or `[]` after `time` seconds (its budget if `None`)
+        '''
+        return self.find_first(context, [name], time)[1]
+
+    def find(self, context: WebDriver | WebElement, name: str, time: float | None = None) -> WebElement:
+        '''
+        Returns the first element of `name` inside `context`, else raises `NoSuchElementException`
+        '''
+        elements = self.find_all(context, name, time)
+        if not elements:
+            raise NoSuchElementException(f'No variant of selector "{name}" matched')
+        return elements[0]
+
+
+selector_registry = SelectorRegistry(os.path.join(logs_folder_path, "selectors.json"))
+
+# Connect action inside a search result card
+selector_registry.register("connect_button", [
+    (By.XPATH, './/button[.//span[text()="Connect"]]'),
+    (By.XPATH, './/a[.//span[text()="Connect"]]'),
+])
+
+# Result cards of people search, in the current and the older layout
+selector_registry.register("search_result_cards", [
+    (By.XPATH, '//div[@data-view-name="edge-creation-connect-action"]'),
+    (By.XPATH, '//li[contains(@class, "reusable-search__result-container")]'),
+], budget=10)
+
+# Bare Connect buttons of people search, when the result cards aren't recognised
+selector_registry.register("search_connect_buttons", [
+    (By.XPATH, '//button[contains(@aria-label, "to connect")]'),
+    (By.XPATH, '//main//button[.//span[text()="Connect"]]'),
+], budget=10)
+
+# Empty state of a search results page
+selector_registry.register("search_no_results", [
+    (By.XPATH, '//*[contains(@class, "search-reusable-search-no-results")]'),
+    (By.XPATH, '//*[contains(@class, "artdeco-empty-state")]'),
+], budget=10)
+
+# Current company button in the top card of a profile
+selector_registry.register("profile_company", [
+    (By.XPATH, '//button[contains(@aria-label,"Current company:")]'),
+], budget=5)
+
+# Experience section of a profile, in either layout
+selector_registry.register("profile_experience", [
+    (By.XPATH, '//section[.//h2[text()="Experience"]]'),
+    (By.XPATH, '//section[.//span[text()="Experience"]]'),
+], budget=5)
@@ -0,0 +1,97 @@
+import os
+import json
+
+from time import time
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from modules.helpers import print_lg, write_atomic
+from modules.clickers_and_finders import load_page
+from config.settings import logs_folder_path, persist_session, linkedin_url
+
+# LinkedIn's authentication cookie, a saved session without a live one is useless
+AUTH_COOKIE = "li_at"
+
+
+def get_session_path() -> str:
+    return os.path.join(logs_folder_path, "session", "cookies.json")
+
+
+def save_session(driver: WebDriver) -> None:
+    '''
+    Saves the cookies of the logged-in `driver`, readable only by the current user
+    '''
+    if not persist_session:
+        return
+    path = get_session_path()
+    try:
+        cookies = driver.get_cookies()
+        if not any(cookie["name"] == AUTH_COOKIE for cookie in cookies):
+            print_lg("Not saving session, no authentication cookie found")
+            return
+        write_atomic(path, json.dumps({"saved_at": time(), "cookies": cookies}), 0o600)
+        print_lg(f"Saved LinkedIn session to {path}")
+    except Exception as e:
+        print_lg(f"Couldn't save LinkedIn session: {e}")
+
+
+def load_session() -> list[dict] | None:
+    '''
+    Returns the saved cookies, or `None` if there are none or the authentication cookie has expired
+    '''
+    path = get_session_path()
+    if not persist_session or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding="utf-8") as file:
+            cookies = json.load(file)["cookies"]
+    except Exception as e:
+        print_lg(f"Couldn't read saved LinkedIn session: {e}")
+        return None
+    now = time()
+    auth = [cookie for cookie in cookies if cookie["name"] == AUTH_COOKIE]
+    if not auth or any(cookie.get("expiry", now + 1) <= now for cookie in auth):
+        print_lg("Saved LinkedIn session has expired")
+        return None
+    return [cookie for cookie in cookies if cookie.get("expiry", now + 1) > now]
+
+
+def restore_session(driver: WebDriver) -> bool:
+    '''
+    Loads the saved cookies into `driver` before anything is opened. Returns `True` if a session was restored.
+    * Uses CDP `Network.setCookies` so no page has to be loaded first, and falls back to `add_cookie` on linkedin.com
+    * Whether LinkedIn still accepts the session is checked by `login_LN`, which skips the login form if so
+    '''
+    cookies = load_session()
+    if not cookies:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [{
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie["domain"],
+            "path": cookie.get("path", "/"),
+            "secure": cookie.get("secure", False),
+            "httpOnly": cookie.get("httpOnly", False),
+            **({"sameSite": cookie["sameSite"]} if cookie.get("sameSite") in ("Strict", "Lax", "None") else {}),
+            **({"expires": cookie["expiry"]} if "expiry" in cookie else {}),
+        } for cookie in cookies]})
+    except Exception:
+        load_page(driver, f"{linkedin_url}/")
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                print_lg(f"Couldn't restore cookie {cookie.get('name')}: {e}")
+    print_lg(f"Restored {len(cookies)} saved LinkedIn cookies")
+    return True
+
+
+def clear_session() -> None:
+    '''
+    Deletes the saved session, eg. after LinkedIn rejected it
+    '''
+    try:
+        os.remove(get_session_path())
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,54 @@
+import re
+import hashlib
+import unicodedata
+
+from config.personals import skip_words
+from config.settings import skip_words_whole_word
+
+
+def normalize_text(text: str) -> str:
+    '''
+    Normalizes `text` for matching: Unicode NFKC, case-folding and whitespace collapsed to single spaces
+    * "  Ｍicrosoft\\u00a0 India " -> "microsoft india"
+    '''
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class SkipWordMatcher:
+    '''
+    Matches text against a list of skip words with one precompiled regular expression.
+    * Skip words and text are both normalized with `normalize_text`
+    * `whole_word = True`: a skip word only matches whole words, "hr" matches "HR Manager" but not "Chrome"
+    * `whole_word = False`: a skip word matches anywhere, "hr" also matches "Chrome"
+    * Multi-word skip words match across any whitespace, "tata consultancy" matches "Tata   Consultancy Services"
+    '''
+
+    def __init__(self, words: list[str], whole_word: bool = True) -> None:
+        self.words = sorted({normalize_text(word) for word in words if word and word.strip()},
+                            key=lambda word: (-len(word), word))
+        self.whole_word = whole_word
+        self.fingerprint = hashlib.sha1(
+            "\n".join([str(whole_word)] + self.words).encode("utf-8")).hexdigest()[:16]
+        self._regex = None
+        if self.words:
+            alternation = "|".join(re.escape(word) for word in self.words)
+            self._regex = re.compile(
+                rf"(?<!\w)(?:{alternation})(?!\w)" if whole_word else alternation)
+
+    def search(self, text: str | None) -> str | None:
+        '''
+        Returns the first skip word found in `text`, else `None`
+        '''
+        if not text or self._regex is None:
+            return None
+        match = self._regex.search(normalize_text(text))
+        return match.group(0) if match else None
+
+    def __contains__(self, text: str | None) -> bool:
+        return self.search(text) is not None
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+
+skip_matcher = SkipWordMatcher(skip_words, skip_words_whole_word)
@@ -0,0 +1,106 @@
+import weakref
+import threading
+
+from contextlib import contextmanager
+
+from selenium.common.exceptions import NoSuchWindowException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from modules.helpers import print_lg
+from modules.open_chrome import apply_resource_blocking
+from modules.clickers_and_finders import load_page
+
+
+class TabManager:
+    '''
+    Keeps long-lived named worker tabs of one driver and navigates them in place, instead of opening and closing a tab per page.
+    * Tabs are tracked by their window handle, never by position in `window_handles`
+    * `home` is the tab that was active when the manager was created
+    * A worker tab that was closed by someone else is recreated on next use
+    * `urls` holds the last URL requested in each tab
+    '''
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.home = driver.current_window_handle
+        self.tabs: dict[str, str] = {}
+        self.urls: dict[str, str] = {}
+
+    def switch(self, name: str = "worker") -> str:
+        '''
+        Switches to the tab `name`, creating it if needed. Returns its handle.
+        '''
+        handle = self.tabs.get(name)
+        if handle:
+            try:
+                self.driver.switch_to.window(handle)
+                return handle
+            except NoSuchWindowException:
+                print_lg(f"Tab '{name}' was closed, opening it again")
+        self.driver.switch_to.new_window("tab")
+        apply_resource_blocking(self.driver)
+        self.tabs[name] = self.driver.current_window_handle
+        self.urls.pop(name, None)
+        return self.tabs[name]
+
+    def open(self, url: str, name: str = "worker") -> str:
+        '''
+        Loads `url` in the tab `name` and leaves it active. Returns its handle.
+        * Uses `load_page`, so with the "none" page load strategy it also waits until the tab reached `url`
+        '''
+        handle = self.switch(name)
+        self.urls[name] = url
+        load_page(self.driver, url)
+        return handle
+
+    def preload(self, url: str, name: str) -> None:
+        '''
+        Starts loading `url` in the tab `name` without waiting for it, then switches back to the previous tab
+        '''
+        previous = self.driver.current_window_handle
+        self.switch(name)
+        self.urls[name] = url
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+        self.driver.switch_to.window(previous)
+
+    def go_home(self) -> None:
+        self.driver.switch_to.window(self.home)
+
+    @contextmanager
+    def use(self, url: str | None = None, name: str = "worker"):
+        '''
+        Context manager that switches to the tab `name` (loading `url` if given) and always switches back to `home` after
+        '''
+        try:
+            if url is None:
+                yield self.switch(name)
+            else:
+                yield self.open(url, name)
+        finally:
+            self.go_home()
+
+    def close(self, name: str) -> None:
+        handle = self.tabs.pop(name, None)
+        self.urls.pop(name, None)
+        if handle is None:
+            return
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except NoSuchWindowException:
+            pass
+        self.go_home()
+
+
+__managers = weakref.WeakKeyDictionary()
+__managers_lock = threading.Lock()
+
+
+def get_tab_manager(driver: WebDriver) -> TabManager:
+    '''
+    Returns the `TabManager` of `driver`, created on first use with the current tab as home
+    '''
+    with __managers_lock:
+        if driver not in __managers:
+            __managers[driver] = TabManager(driver)
+        return __managers[driver]
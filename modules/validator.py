@@ -21,6 +21,15 @@ def check_string(var: str, var_name: str, options: list = [], min_length: int =
     return True
 
 
+def check_int(var: int, var_name: str, min_value: int = 0) -> bool | TypeError | ValueError:
+    if not isinstance(var, int) or isinstance(var, bool):
+        raise TypeError(f'Invalid input for {var_name}. Expecting an Integer!')
+    if var < min_value:
+        raise ValueError(
+            f'Invalid input for {var_name}. Expecting an Integer greater than or equal to {min_value}, not {var}!')
+    return True
+
+
 def validate_settings() -> None | ValueError | TypeError:
     '''
     Validates all variables in the `/config/settings.py` file.
@@ -29,12 +38,41 @@ def validate_settings() -> None | ValueError | TypeError:
     __validation_file_path = "config/settings.py"
 
     check_string(logs_folder_path, "logs_folder_path", min_length=1)
+    check_string(linkedin_url, "linkedin_url", min_length=1)
 
     check_boolean(run_in_background, "run_in_background")
     check_boolean(disable_extensions, "disable_extensions")
     check_boolean(safe_mode, "safe_mode")
     check_boolean(stealth_mode, "stealth_mode")
 
+    check_int(worker_count, "worker_count", 1)
+    check_int(log_max_size_mb, "log_max_size_mb")
+    check_int(log_max_age_hours, "log_max_age_hours")
+    check_int(log_backup_count, "log_backup_count")
+    check_boolean(compress_old_logs, "compress_old_logs")
+    check_boolean(http_validation, "http_validation")
+    check_int(profile_cache_ttl_hours, "profile_cache_ttl_hours")
+    check_boolean(skip_words_whole_word, "skip_words_whole_word")
+    check_boolean(single_visit_messaging, "single_visit_messaging")
+    check_boolean(prefetch_search_pages, "prefetch_search_pages")
+    check_boolean(persist_session, "persist_session")
+    check_boolean(persist_browser_cache, "persist_browser_cache")
+    check_string(page_load_strategy, "page_load_strategy", ["normal", "eager", "none"])
+    check_boolean(block_heavy_resources, "block_heavy_resources")
+    if not isinstance(blocked_url_patterns, list) or not all(isinstance(pattern, str) for pattern in blocked_url_patterns):
+        raise TypeError('Invalid input for blocked_url_patterns. Expecting a List of Strings!')
+    if not isinstance(rate_limits, dict):
+        raise TypeError('Invalid input for rate_limits. Expecting a Dictionary of actions!')
+    for action, limits in rate_limits.items():
+        for name in ["burst", "per_hour", "per_day"]:
+            check_int(limits.get(name, 0), f'rate_limits["{action}"]["{name}"]')
+    if not isinstance(rate_jitter, (int, float)) or isinstance(rate_jitter, bool) or rate_jitter < 0:
+        raise TypeError('Invalid input for rate_jitter. Expecting a Number greater than or equal to 0!')
+    check_int(rate_max_wait_minutes, "rate_max_wait_minutes")
+    check_int(throttle_pause_minutes, "throttle_pause_minutes")
+    check_boolean(export_metrics, "export_metrics")
+    check_string(prometheus_textfile_path, "prometheus_textfile_path")
+
 def validate_personal() -> None | ValueError | TypeError:
     '''
     Validates all variables in the `/config/personal.py` file.
@@ -0,0 +1,79 @@
+import os
+
+from modules.helpers import print_lg, critical_error_log, make_directories
+from modules.open_chrome import createChromeSession
+from modules.clickers_and_finders import load_page
+from config.settings import logs_folder_path, worker_count, linkedin_url
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def get_worker_profile(index: int) -> str:
+    '''
+    Returns the user-data-dir of worker `index`, kept inside `logs_folder_path` so workers never share a profile lock
+    '''
+    return os.path.abspath(os.path.join(logs_folder_path, "profiles", f"worker-{index}"))
+
+
+def copy_session(source: WebDriver, target: WebDriver, url: str = f"{linkedin_url}/") -> None:
+    '''
+    Copies the cookies of the logged-in `source` browser into `target`, so workers don't need to log in again
+    '''
+    load_page(target, url)
+    for cookie in source.get_cookies():
+        try:
+            target.add_cookie(cookie)
+        except Exception as e:
+            print_lg(f"Couldn't copy cookie {cookie.get('name')}: {e}")
+
+
+class BrowserPool:
+    '''
+    Pool of `size` independent Chrome sessions, used as the workers of the messaging pipeline.
+    * Every session is created with `createChromeSession` and its own profile directory
+    * If `source` is given, its login cookies are copied into every worker
+    * Use as a context manager so all sessions are quit at the end
+    '''
+
+    def __init__(self, size: int, source: WebDriver | None = None) -> None:
+        self.size = size
+        self.source = source
+        self.drivers: list[WebDriver] = []
+
+    def start(self) -> "BrowserPool":
+        for index in range(self.size):
+            profile = get_worker_profile(index)
+            make_directories([profile])
+            try:
+                _, driver, _, _ = createChromeSession(user_data_dir=profile)
+            except Exception as e:
+                critical_error_log(f"Failed to start worker {index}", e)
+                continue
+            if self.source:
+                copy_session(self.source, driver)
+            self.drivers.append(driver)
+        print_lg(f"Started {len(self.drivers)} of {self.size} worker browsers.")
+        return self
+
+    def close(self) -> None:
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = []
+
+    def __enter__(self) -> "BrowserPool":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_worker_pool(source: WebDriver) -> BrowserPool | None:
+    '''
+    Returns a `BrowserPool` of `worker_count` sessions sharing the login of `source`, or `None` if `worker_count <= 1`
+    '''
+    if worker_count <= 1:
+        return None
+    return BrowserPool(worker_count, source)